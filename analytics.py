@@ -0,0 +1,156 @@
+from datetime import date
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from columns import FIELDS, MISSING, SLOT_SECONDS, SLOTS_PER_DAY, ObservationColumns
+
+
+def align_sites(
+    sites: Sequence[ObservationColumns],
+    start: date,
+    end: date,
+    field: str = "total_volume",
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """
+    Aligns the chosen field of many sites onto a common 15 minute grid from start to end inclusive, returning a sites by slots array with NaN for gaps.
+    """
+    if field not in FIELDS:
+        raise ValueError(f"Field must be one of {sorted(FIELDS)}, got {field}")
+    days = (end - start).days + 1
+    if days <= 0:
+        raise ValueError(f"End date {end} is before start date {start}")
+
+    grid = np.full((len(sites), days * SLOTS_PER_DAY), np.nan, dtype=dtype)
+
+    for row, columns in enumerate(sites):
+        if not len(columns):
+            continue
+
+        # views over the column buffers, no values are copied
+        ordinals = np.frombuffer(columns.report_dates, dtype=np.intc)
+        times = np.frombuffer(columns.times, dtype=np.intc)
+        values = np.frombuffer(getattr(columns, FIELDS[field]), dtype=np.intc)
+
+        slots = (ordinals - start.toordinal()) * SLOTS_PER_DAY + times // SLOT_SECONDS
+        keep = (slots >= 0) & (slots < grid.shape[1]) & (values != MISSING)
+        grid[row, slots[keep]] = values[keep]
+
+    return grid
+
+
+def correlation_matrix(
+    grid: np.ndarray, chunk_size: int = 256, min_periods: int = 2
+) -> np.ndarray:
+    """
+    Returns the pairwise Pearson correlation between every pair of sites in an aligned grid, using only slots where both sites have data.
+    """
+    return cross_correlation(grid, grid, chunk_size, min_periods)
+
+
+def cross_correlation(
+    a: np.ndarray, b: np.ndarray, chunk_size: int = 256, min_periods: int = 2
+) -> np.ndarray:
+    """
+    Returns the Pearson correlation between every row of a and every row of b, which must have the same number of slots, NaN where too few slots overlap or a row is constant.
+    """
+    result = np.full((a.shape[0], b.shape[0]), np.nan)
+    b_values, b_mask = _split_gaps(b)
+
+    for start in range(0, a.shape[0], chunk_size):
+        a_values, a_mask = _split_gaps(a[start : start + chunk_size])
+        n, sum_a, sum_b, sum_aa, sum_bb, sum_ab = _pairwise_sums(
+            a_values, a_mask, b_values, b_mask
+        )
+
+        covariance = n * sum_ab - sum_a * sum_b
+        variance = (n * sum_aa - sum_a**2) * (n * sum_bb - sum_b**2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block = covariance / np.sqrt(variance)
+        block[(n < min_periods) | (variance <= 0)] = np.nan
+
+        result[start : start + chunk_size] = np.clip(block, -1, 1)
+
+    return result
+
+
+def distance_matrix(
+    grid: np.ndarray, chunk_size: int = 256, min_periods: int = 1
+) -> np.ndarray:
+    """
+    Returns the root mean square difference between every pair of sites in an aligned grid, using only slots where both sites have data.
+    """
+    result = np.full((grid.shape[0], grid.shape[0]), np.nan)
+    values, mask = _split_gaps(grid)
+
+    for start in range(0, grid.shape[0], chunk_size):
+        block_values, block_mask = _split_gaps(grid[start : start + chunk_size])
+        n, _, _, sum_aa, sum_bb, sum_ab = _pairwise_sums(
+            block_values, block_mask, values, mask
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block = np.sqrt(np.maximum(sum_aa - 2 * sum_ab + sum_bb, 0) / n)
+        block[n < min_periods] = np.nan
+
+        result[start : start + chunk_size] = block
+
+    return result
+
+
+def lag_matrix(
+    grid: np.ndarray, max_lag: int = 4, chunk_size: int = 256, min_periods: int = 2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the shift of up to max_lag slots that best correlates each pair of sites, returning the best lags and their correlations, a positive lag means the second site follows the first.
+    """
+    if max_lag < 0:
+        raise ValueError(f"Maximum lag must not be negative, got {max_lag}")
+
+    slots = grid.shape[1]
+    best_lags = np.zeros((grid.shape[0], grid.shape[0]), dtype=np.int64)
+    best_correlations = np.full((grid.shape[0], grid.shape[0]), np.nan)
+
+    for lag in range(-max_lag, max_lag + 1):
+        if abs(lag) >= slots:
+            continue
+        if lag >= 0:
+            correlations = cross_correlation(
+                grid[:, : slots - lag], grid[:, lag:], chunk_size, min_periods
+            )
+        else:
+            correlations = cross_correlation(
+                grid[:, -lag:], grid[:, : slots + lag], chunk_size, min_periods
+            )
+
+        # NaN never compares greater, so pairs keep their previous best
+        better = np.isnan(best_correlations) & ~np.isnan(correlations)
+        better |= correlations > best_correlations
+        best_lags[better] = lag
+        best_correlations[better] = correlations[better]
+
+    return best_lags, best_correlations
+
+
+def _split_gaps(grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the grid with gaps replaced by zero, and a matching mask of 1 where data exists and 0 for gaps.
+    """
+    mask = ~np.isnan(grid)
+    return np.where(mask, grid, 0).astype(np.float64), mask.astype(np.float64)
+
+
+def _pairwise_sums(
+    a_values: np.ndarray, a_mask: np.ndarray, b_values: np.ndarray, b_mask: np.ndarray
+) -> Tuple[np.ndarray, ...]:
+    """
+    Returns the overlap counts, sums, sums of squares, and sums of products for every pair of rows, counting only slots where both rows have data.
+    """
+    n = a_mask @ b_mask.T
+    sum_a = a_values @ b_mask.T
+    sum_b = a_mask @ b_values.T
+    sum_aa = (a_values**2) @ b_mask.T
+    sum_bb = a_mask @ (b_values**2).T
+    sum_ab = a_values @ b_values.T
+    return n, sum_a, sum_b, sum_aa, sum_bb, sum_ab
@@ -0,0 +1,183 @@
+import gzip
+import json
+import os
+import threading
+from datetime import date
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlsplit
+
+from codec import decode_site_day, encode_site_day
+from columns import MISSING, ObservationColumns
+from rollups import SiteRollups
+from webtris_client import APIConnectionError, APIResponseError
+
+
+class ArchiveConnector:
+    """
+    Answers API requests from a local archive of gzipped responses instead of the network, optionally filling the archive from another connector.
+    """
+
+    # required attributes
+    path: str
+    compact: bool
+
+    def __init__(self, path: str, fallback: Any = None, compact: bool = False) -> None:
+        """
+        Creates an ArchiveConnector for an archive directory, requests missing from the archive are fetched with the fallback connector if one is given, and compact archives store single site-days with the delta bit-packed codec instead of gzipped JSON.
+        """
+        self.path = path
+        self.fallback = fallback
+        self.compact = compact
+        os.makedirs(path, exist_ok=True)
+
+    def make_request(self, url: str) -> Dict[str, Any]:
+        """
+        Returns the archived JSON response for the URL as a dictionary.
+        """
+        return json.loads(self.make_raw_request(url))
+
+    def make_raw_request(self, url: str) -> bytes:
+        """
+        Returns the archived response body for the URL, fetching and archiving it with the fallback connector if it is missing, raises an APIConnectionError if it cannot be found.
+        """
+        columns = self.load_columns(url)
+        if columns is not None:
+            return _response_body(columns)
+
+        try:
+            with gzip.open(self.file_path(url), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            if self.fallback is None:
+                raise APIConnectionError(
+                    f"Offline mode, no archived response for {url}"
+                )
+
+        raw = self.fallback.make_raw_request(url)
+        self.save(url, raw)
+        return raw
+
+    def save(self, url: str, raw: bytes) -> None:
+        """
+        Writes a response body to the archive with its rollups alongside, replacing each file in one step so readers never see a partial file.
+        """
+        try:
+            columns = ObservationColumns.from_json_response(json.loads(raw))
+        except (APIResponseError, KeyError, ValueError):
+            columns = None  # not a page of observations, so it is kept as it is
+
+        encoded = None
+        if self.compact and columns is not None:
+            columns.sort()
+            try:
+                encoded = encode_site_day(columns)
+            except ValueError:
+                pass  # several days or off the 15 minute grid, so kept as JSON
+
+        # only one form of each response is kept, so a stale copy is never read
+        if encoded is not None:
+            _write_file(self.compact_path(url), encoded)
+            _remove_file(self.file_path(url))
+        else:
+            _write_file(self.file_path(url), gzip.compress(raw))
+            _remove_file(self.compact_path(url))
+
+        if columns is None:
+            return
+
+        rollups_path = self.rollups_path(url)
+        temporary_path = _temporary_path(rollups_path)
+        SiteRollups.from_columns(columns).save(temporary_path)
+        os.replace(temporary_path, rollups_path)
+
+    def load_columns(self, url: str) -> ObservationColumns | None:
+        """
+        Returns the columns of a site-day archived in compact form for the URL, or None if it is not stored that way.
+        """
+        try:
+            with open(self.compact_path(url), "rb") as file:
+                return decode_site_day(file.read())
+        except FileNotFoundError:
+            return None
+
+    def load_rollups(self, url: str) -> SiteRollups | None:
+        """
+        Returns the rollups saved with the archived response for the URL, or None if there are none.
+        """
+        try:
+            return SiteRollups.load(self.rollups_path(url))
+        except FileNotFoundError:
+            return None
+
+    def file_path(self, url: str) -> str:
+        """
+        Returns the archive file used for a URL, named after its site, date range, page, and page size.
+        """
+        query = parse_qs(urlsplit(url).query)
+
+        name = "_".join(
+            query.get(param, [""])[0]
+            for param in ("sites", "start_date", "end_date", "page", "page_size")
+        )
+        return os.path.join(self.path, name.replace(os.sep, "-") + ".json.gz")
+
+    def compact_path(self, url: str) -> str:
+        """
+        Returns the file used for a URL when its site-day is stored in compact form.
+        """
+        return self.file_path(url)[: -len(".json.gz")] + ".day"
+
+    def rollups_path(self, url: str) -> str:
+        """
+        Returns the file the rollups for an archived URL are saved in, next to its response.
+        """
+        return self.file_path(url)[: -len(".json.gz")] + ".rollups.json"
+
+
+def _temporary_path(file_path: str) -> str:
+    """
+    Returns the temporary file a file is written to before being moved into place, unique to the process and thread so concurrent saves of one URL do not share it.
+    """
+    return f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_file(file_path: str, data: bytes) -> None:
+    """
+    Writes data to a file in one step, so readers never see a partial file.
+    """
+    temporary_path = _temporary_path(file_path)
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_path, file_path)
+
+
+def _remove_file(file_path: str) -> None:
+    """
+    Removes a file if it exists.
+    """
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _response_body(columns: ObservationColumns) -> bytes:
+    """
+    Rebuilds an API response body from columns, with the fields APIClient reads from each row.
+    """
+    rows = []
+    for ordinal, seconds, avg_speed, total_volume in zip(
+        columns.report_dates, columns.times, columns.avg_speeds, columns.total_volumes
+    ):
+        rows.append(
+            {
+                "Site Name": columns.site_name,
+                "Report Date": f"{date.fromordinal(ordinal).isoformat()}T00:00:00",
+                "Time Period Ending": f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}",
+                "Avg mph": "" if avg_speed == MISSING else str(avg_speed),
+                "Total Volume": "" if total_volume == MISSING else str(total_volume),
+            }
+        )
+    return json.dumps({"Header": {"row_count": len(rows)}, "Rows": rows}).encode(
+        "utf-8"
+    )
@@ -0,0 +1,63 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List
+
+# run in a fresh interpreter, prints the import time in ms and whether requests was imported
+TIMING_CODE = """
+import sys, time
+start = time.perf_counter()
+import webtris_client
+print((time.perf_counter() - start) * 1000, "requests" in sys.modules)
+"""
+
+
+def time_import(runs: int) -> List[float]:
+    """
+    Imports webtris_client in a fresh interpreter for each run and returns the import times in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMING_CODE],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        if output[1] == "True":
+            raise RuntimeError("Importing webtris_client imported requests")
+        timings.append(float(output[0]))
+    return timings
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Runs the startup benchmark and returns 1 if the median import time is over the limit.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark webtris_client import time."
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--max-ms", type=float, help="fail if the median import time is above this"
+    )
+    args = parser.parse_args(argv)
+
+    timings = time_import(args.runs)
+    median = statistics.median(timings)
+    print(
+        f"webtris_client import: median {median:.2f}ms, "
+        f"min {min(timings):.2f}ms, max {max(timings):.2f}ms over {args.runs} runs"
+    )
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"Median import time is above {args.max_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import struct
+from array import array
+from datetime import date
+from typing import Tuple
+
+from columns import (
+    COLUMN_TYPECODE,
+    MISSING,
+    SLOT_SECONDS,
+    SLOTS_PER_DAY,
+    ObservationColumns,
+)
+
+# periods end 14 minutes into each 15 minute slot
+SLOT_END_OFFSET = 14 * 60
+
+# bytes needed for one presence bit per slot
+BITMAP_BYTES = SLOTS_PER_DAY // 8
+
+# first byte of every encoded day, changed if the format ever changes
+FORMAT_VERSION = 2
+
+# the first present value of each series, stored before its packed deltas
+_FIRST_VALUE = struct.Struct("<i")
+
+# header written before a self-describing site-day, report date ordinal then site name length
+_SITE_DAY_HEADER = struct.Struct("<IH")
+
+
+def encode_day(columns: ObservationColumns) -> bytes:
+    """
+    Encodes one site-day of columns with implicit timestamps, presence bitmaps, and delta bit-packed values, raises a ValueError if the rows are not one day in slot order on the 15 minute grid.
+    """
+    slots = _grid_slots(columns)
+
+    # a bitmap of the slots that have a row, even if both its values are missing
+    rows = 0
+    for slot in slots:
+        rows |= 1 << slot
+
+    data = bytearray([FORMAT_VERSION])
+    data += rows.to_bytes(BITMAP_BYTES, "little")
+    for column in (columns.avg_speeds, columns.total_volumes):
+        series = [MISSING] * SLOTS_PER_DAY
+        for slot, value in zip(slots, column):
+            series[slot] = value
+        data += _encode_series(series)
+    return bytes(data)
+
+
+def decode_series(data: bytes) -> Tuple[array, array]:
+    """
+    Decodes an encoded day into full 96 slot speed and volume arrays, with MISSING for slots without data.
+    """
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError("Unknown encoded day format")
+
+    speeds, offset = _decode_series(data, 1 + BITMAP_BYTES)
+    volumes, _ = _decode_series(data, offset)
+    return speeds, volumes
+
+
+def decode_day(data: bytes, site_name: str, report_date: date) -> ObservationColumns:
+    """
+    Decodes an encoded day back into the ObservationColumns it was encoded from.
+    """
+    speeds, volumes = decode_series(data)
+    rows = int.from_bytes(data[1 : 1 + BITMAP_BYTES], "little")
+    present = [slot for slot in range(SLOTS_PER_DAY) if rows >> slot & 1]
+
+    return ObservationColumns(
+        site_name,
+        array(COLUMN_TYPECODE, [report_date.toordinal()] * len(present)),
+        array(
+            COLUMN_TYPECODE,
+            [slot * SLOT_SECONDS + SLOT_END_OFFSET for slot in present],
+        ),
+        array(COLUMN_TYPECODE, [speeds[slot] for slot in present]),
+        array(COLUMN_TYPECODE, [volumes[slot] for slot in present]),
+    )
+
+
+def encode_site_day(columns: ObservationColumns) -> bytes:
+    """
+    Encodes one site-day like encode_day, with its site name and report date in front so it can be decoded on its own.
+    """
+    encoded = encode_day(columns)
+    name = columns.site_name.encode("utf-8")
+    ordinal = columns.report_dates[0] if len(columns) else date.min.toordinal()
+    return _SITE_DAY_HEADER.pack(ordinal, len(name)) + name + encoded
+
+
+def decode_site_day(data: bytes) -> ObservationColumns:
+    """
+    Decodes a site-day written by encode_site_day back into ObservationColumns.
+    """
+    ordinal, name_length = _SITE_DAY_HEADER.unpack_from(data)
+    start = _SITE_DAY_HEADER.size
+    site_name = bytes(data[start : start + name_length]).decode("utf-8")
+    return decode_day(
+        bytes(data[start + name_length :]), site_name, date.fromordinal(ordinal)
+    )
+
+
+def _grid_slots(columns: ObservationColumns) -> list:
+    """
+    Returns the grid slot of each row, raising a ValueError if the rows cannot be rebuilt exactly from their slots.
+    """
+    if len(set(columns.report_dates)) > 1:
+        raise ValueError("Encoded days must contain a single date")
+
+    slots = []
+    for seconds in columns.times:
+        if seconds % SLOT_SECONDS != SLOT_END_OFFSET:
+            raise ValueError(f"Time {seconds}s is not on the 15 minute grid")
+        slot = seconds // SLOT_SECONDS
+        if slots and slot <= slots[-1]:
+            raise ValueError("Rows must be in slot order without duplicates")
+        slots.append(slot)
+    return slots
+
+
+def _encode_series(series: list) -> bytes:
+    """
+    Encodes a 96 slot series as a presence bitmap, a bit width, the first present value, and the zigzag deltas of the rest packed at that width.
+    """
+    bitmap = 0
+    values = []
+    for slot, value in enumerate(series):
+        if value != MISSING:
+            bitmap |= 1 << slot
+            values.append(value)
+
+    # the first value is stored whole so it does not widen every packed delta
+    deltas = []
+    for previous, value in zip(values, values[1:]):
+        delta = value - previous
+        deltas.append(delta * 2 if delta >= 0 else -delta * 2 - 1)  # zigzag
+
+    width = max(deltas, default=0).bit_length()
+    packed = 0
+    for index, delta in enumerate(deltas):
+        packed |= delta << (index * width)
+
+    return (
+        bitmap.to_bytes(BITMAP_BYTES, "little")
+        + bytes([width])
+        + (_FIRST_VALUE.pack(values[0]) if values else b"")
+        + packed.to_bytes((len(deltas) * width + 7) // 8, "little")
+    )
+
+
+def _decode_series(data: bytes, offset: int) -> Tuple[array, int]:
+    """
+    Decodes one series starting at offset, returning it as a 96 slot array and the offset just after it.
+    """
+    bitmap = int.from_bytes(data[offset : offset + BITMAP_BYTES], "little")
+    width = data[offset + BITMAP_BYTES]
+    offset += BITMAP_BYTES + 1
+
+    series = array(COLUMN_TYPECODE, [MISSING]) * SLOTS_PER_DAY
+    count = bin(bitmap).count("1")
+    if not count:
+        return series, offset
+
+    (value,) = _FIRST_VALUE.unpack_from(data, offset)
+    offset += _FIRST_VALUE.size
+    length = ((count - 1) * width + 7) // 8
+    packed = int.from_bytes(data[offset : offset + length], "little")
+    mask = (1 << width) - 1
+
+    index = -1
+    for slot in range(SLOTS_PER_DAY):
+        if not bitmap >> slot & 1:
+            continue
+        if index >= 0:
+            zigzag = packed >> (index * width) & mask
+            value += zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+        series[slot] = value
+        index += 1
+
+    return series, offset + length
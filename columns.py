@@ -0,0 +1,239 @@
+import struct
+from array import array
+from datetime import date, time
+from typing import Any, Dict, List
+
+from webtris_client import APIResponseError, Observation
+
+# value stored in the speed and volume columns when the API has no data
+MISSING = -1
+
+# typecode used for every column, 4 byte signed integers
+COLUMN_TYPECODE = "i"
+
+# the API reports traffic in 15 minute intervals, 96 per day
+SLOTS_PER_DAY = 96
+SLOT_SECONDS = 900
+
+# speed and volume fields, with the column of ObservationColumns holding each
+FIELDS = {"avg_speed": "avg_speeds", "total_volume": "total_volumes"}
+
+# header for packed columns, site name length followed by row count
+_HEADER = struct.Struct("<IQ")
+
+
+class ObservationColumns:
+    """
+    Stores the observations for a single site as compact integer columns instead of a list of Observation objects.
+    """
+
+    # required attributes
+    site_name: str
+    report_dates: array  # date ordinals
+    times: array  # seconds since midnight of the time period ending
+    avg_speeds: array  # MISSING where there is no speed data
+    total_volumes: array  # MISSING where there is no volume data
+
+    def __init__(
+        self,
+        site_name: str,
+        report_dates: array | None = None,
+        times: array | None = None,
+        avg_speeds: array | None = None,
+        total_volumes: array | None = None,
+    ) -> None:
+        """
+        Creates ObservationColumns with a site name and optional existing columns, missing columns start empty.
+        """
+        self.site_name = site_name
+        self.report_dates = (
+            report_dates if report_dates is not None else array(COLUMN_TYPECODE)
+        )
+        self.times = times if times is not None else array(COLUMN_TYPECODE)
+        self.avg_speeds = (
+            avg_speeds if avg_speeds is not None else array(COLUMN_TYPECODE)
+        )
+        self.total_volumes = (
+            total_volumes if total_volumes is not None else array(COLUMN_TYPECODE)
+        )
+
+        lengths = {
+            len(self.report_dates),
+            len(self.times),
+            len(self.avg_speeds),
+            len(self.total_volumes),
+        }
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+
+    @classmethod
+    def from_json_response(cls, json_data: Dict[str, Any]) -> "ObservationColumns":
+        """
+        Parses a JSON response from the API straight into columns, raising an APIResponseError if not in the right format.
+        """
+        if "Rows" not in json_data:
+            raise APIResponseError("Invalid API response, missing 'Rows'")
+
+        rows = json_data["Rows"]
+        columns = cls(rows[0]["Site Name"] if rows else "")
+
+        # local names avoid attribute lookups in the loop
+        report_dates = columns.report_dates
+        times = columns.times
+        avg_speeds = columns.avg_speeds
+        total_volumes = columns.total_volumes
+        ordinals: Dict[str, int] = {}
+
+        for row in rows:
+            # API returns dates like "2025-10-19T00:00:00", cache the ordinal per day
+            date_str = row["Report Date"]
+            ordinal = ordinals.get(date_str)
+            if ordinal is None:
+                ordinal = date(
+                    int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])
+                ).toordinal()
+                ordinals[date_str] = ordinal
+            report_dates.append(ordinal)
+
+            # API returns times like "00:14:00"
+            hour, minute, second = row["Time Period Ending"].split(":")
+            times.append(int(hour) * 3600 + int(minute) * 60 + int(second))
+
+            avg_speeds.append(_parse_optional_int(row.get("Avg mph", "")))
+            total_volumes.append(_parse_optional_int(row.get("Total Volume", "")))
+
+        return columns
+
+    @classmethod
+    def from_observations(cls, observations: List[Observation]) -> "ObservationColumns":
+        """
+        Converts a list of Observations into columns, using the first observation's site name.
+        """
+        columns = cls(observations[0].site_name if observations else "")
+
+        for observation in observations:
+            columns.report_dates.append(observation.report_date.toordinal())
+            columns.times.append(
+                observation.time_period_ending.hour * 3600
+                + observation.time_period_ending.minute * 60
+                + observation.time_period_ending.second
+            )
+            columns.avg_speeds.append(
+                MISSING if observation.avg_speed is None else observation.avg_speed
+            )
+            columns.total_volumes.append(
+                MISSING
+                if observation.total_volume is None
+                else observation.total_volume
+            )
+
+        return columns
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> "ObservationColumns":
+        """
+        Rebuilds columns from the packed format produced by to_bytes.
+        """
+        with memoryview(data) as view:
+            name_length, row_count = _HEADER.unpack_from(view, 0)
+            offset = _HEADER.size
+            site_name = bytes(view[offset : offset + name_length]).decode("utf-8")
+            offset += name_length
+
+            columns = []
+            column_bytes = row_count * array(COLUMN_TYPECODE).itemsize
+            for _ in range(4):
+                column = array(COLUMN_TYPECODE)
+                with view[offset : offset + column_bytes] as column_view:
+                    column.frombytes(column_view)
+                columns.append(column)
+                offset += column_bytes
+
+        return cls(site_name, *columns)
+
+    def packed_size(self) -> int:
+        """
+        Returns the number of bytes needed to pack the site name and all columns.
+        """
+        column_bytes = len(self) * self.report_dates.itemsize
+        return _HEADER.size + len(self.site_name.encode("utf-8")) + 4 * column_bytes
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int = 0) -> int:
+        """
+        Packs the site name and all columns into an existing writable buffer, such as shared memory, and returns the number of bytes written.
+        """
+        name = self.site_name.encode("utf-8")
+        view = memoryview(buffer)
+        _HEADER.pack_into(view, offset, len(name), len(self))
+        position = offset + _HEADER.size
+        view[position : position + len(name)] = name
+        position += len(name)
+
+        for column in (
+            self.report_dates,
+            self.times,
+            self.avg_speeds,
+            self.total_volumes,
+        ):
+            column_bytes = len(column) * column.itemsize
+            view[position : position + column_bytes] = memoryview(column).cast("B")
+            position += column_bytes
+
+        view.release()
+        return position - offset
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the site name and all columns into a single contiguous bytes object.
+        """
+        buffer = bytearray(self.packed_size())
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    def sort(self) -> None:
+        """
+        Sorts the columns in place chronologically, first by date and then by time.
+        """
+        order = sorted(
+            range(len(self)), key=lambda i: (self.report_dates[i], self.times[i])
+        )
+        for name in ("report_dates", "times", "avg_speeds", "total_volumes"):
+            column = getattr(self, name)
+            setattr(self, name, array(COLUMN_TYPECODE, [column[i] for i in order]))
+
+    def to_observations(self) -> List[Observation]:
+        """
+        Converts the columns back into a list of Observation objects.
+        """
+        return [
+            Observation(
+                site_name=self.site_name,
+                report_date=date.fromordinal(ordinal),
+                time_period_ending=time(
+                    hour=seconds // 3600,
+                    minute=seconds % 3600 // 60,
+                    second=seconds % 60,
+                ),
+                avg_speed=None if avg_speed == MISSING else avg_speed,
+                total_volume=None if total_volume == MISSING else total_volume,
+            )
+            for ordinal, seconds, avg_speed, total_volume in zip(
+                self.report_dates, self.times, self.avg_speeds, self.total_volumes
+            )
+        ]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of observations stored in the columns.
+        """
+        return len(self.report_dates)
+
+
+def _parse_optional_int(value: str) -> int:
+    """
+    Converts a string from the API into an integer, returns MISSING if the value is empty or invalid.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return MISSING
@@ -0,0 +1,75 @@
+from array import array
+from datetime import date, time
+from typing import Callable, List
+import pytest
+from columns import COLUMN_TYPECODE, MISSING, ObservationColumns
+from webtris_client import APIResponseError, Observation
+
+
+# fixture for a builder of a full day of 15 minute observations, speed and volume may be functions of the slot
+@pytest.fixture
+def make_day() -> Callable[..., List[Observation]]:
+    def build(
+        report_date: date,
+        site_name: str = "Example Site",
+        speed: int | None | Callable[[int], int | None] = 60,
+        volume: int | None | Callable[[int], int | None] = 100,
+    ) -> List[Observation]:
+        return [
+            Observation(
+                site_name=site_name,
+                report_date=report_date,
+                time_period_ending=time(hour=slot // 4, minute=slot % 4 * 15 + 14),
+                avg_speed=speed(slot) if callable(speed) else speed,
+                total_volume=volume(slot) if callable(volume) else volume,
+            )
+            for slot in range(96)
+        ]
+
+    return build
+
+
+# fixture for a builder of one day of columns from (slot, speed, volume) rows, None for gaps
+@pytest.fixture
+def make_columns() -> Callable[..., ObservationColumns]:
+    def build(
+        rows, report_date: date = date(2024, 1, 1), site_name: str = "Example Site"
+    ) -> ObservationColumns:
+        return ObservationColumns(
+            site_name,
+            array(COLUMN_TYPECODE, [report_date.toordinal()] * len(rows)),
+            array(COLUMN_TYPECODE, [slot * 900 + 840 for slot, _, _ in rows]),
+            array(
+                COLUMN_TYPECODE,
+                [MISSING if speed is None else speed for _, speed, _ in rows],
+            ),
+            array(
+                COLUMN_TYPECODE,
+                [MISSING if volume is None else volume for _, _, volume in rows],
+            ),
+        )
+
+    return build
+
+
+# fixture for a builder of API responses with two intervals for the date in the url, site 999 is not found
+@pytest.fixture
+def make_response() -> Callable[[str], dict]:
+    def build(url: str) -> dict:
+        if "sites=999" in url:
+            raise APIResponseError("Site not found (404)")
+        day = url.split("start_date=")[1][:8]
+        return {
+            "Rows": [
+                {
+                    "Site Name": "Example Site",
+                    "Report Date": f"{day[4:]}-{day[2:4]}-{day[:2]}T00:00:00",
+                    "Time Period Ending": time_period,
+                    "Avg mph": "60",
+                    "Total Volume": "100",
+                }
+                for time_period in ["08:14:00", "08:29:00"]
+            ]
+        }
+
+    return build
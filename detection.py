@@ -0,0 +1,313 @@
+from datetime import date, datetime, timedelta
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from columns import SLOT_SECONDS
+
+# kinds of event the detector reports
+CONGESTION = "congestion"
+DEAD_SENSOR = "dead_sensor"
+
+
+class Event:
+    """
+    A congestion episode or dead sensor period at one site, from its start up to but not including its end.
+    """
+
+    # required attributes
+    site_id: int
+    kind: str
+    start: datetime
+    end: datetime
+    severity: float
+    ongoing: bool
+
+    def __init__(
+        self,
+        site_id: int,
+        kind: str,
+        start: datetime,
+        end: datetime,
+        severity: float,
+        ongoing: bool = False,
+    ) -> None:
+        """
+        Creates an Event with its site, kind, time span, severity, and whether it is still in progress.
+        """
+        self.site_id = site_id
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.severity = severity
+        self.ongoing = ongoing
+
+    def __eq__(self, other: "Event") -> bool:
+        """
+        Returns True if two events share the same site, kind, time span, severity, and ongoing state.
+        """
+        return (
+            self.site_id == other.site_id
+            and self.kind == other.kind
+            and self.start == other.start
+            and self.end == other.end
+            and self.severity == other.severity
+            and self.ongoing == other.ongoing
+        )
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the event including all attributes.
+        """
+        return f"Event(site={self.site_id}, kind={self.kind}, start={self.start}, end={self.end}, severity={self.severity:.2f}, ongoing={self.ongoing})"
+
+
+class EventDetector:
+    """
+    Scans aligned speed and volume grids for many sites at once, comparing each slot with a rolling baseline, and can be fed new slots as they arrive.
+    """
+
+    # required attributes
+    site_ids: List[int]
+    origin: datetime
+    window: int
+    speed_drop: float
+    volume_ratio: float
+    min_congestion: int
+    min_dead: int
+
+    def __init__(
+        self,
+        site_ids: Sequence[int],
+        start: date | datetime,
+        window: int = 16,
+        speed_drop: float = 0.3,
+        volume_ratio: float = 0.8,
+        min_congestion: int = 2,
+        min_dead: int = 4,
+    ) -> None:
+        """
+        Creates an EventDetector for sites whose grids start at the given date, using a baseline over the previous window slots, where congestion is speed below (1 - speed_drop) of baseline with volume at least volume_ratio of baseline.
+        """
+        if window < 1:
+            raise ValueError(f"Window must be at least 1 slot, got {window}")
+        if not (0 < speed_drop < 1):
+            raise ValueError(f"Speed drop must be between 0 and 1, got {speed_drop}")
+
+        self.site_ids = list(site_ids)
+        if isinstance(start, datetime):
+            self.origin = start
+        else:
+            self.origin = datetime(start.year, start.month, start.day)
+        self.window = window
+        self.speed_drop = speed_drop
+        self.volume_ratio = volume_ratio
+        self.min_congestion = min_congestion
+        self.min_dead = min_dead
+
+        # slots seen so far, and the trailing slots kept for the baselines
+        sites = len(self.site_ids)
+        self._slot = 0
+        self._speed_history = np.zeros((sites, 0))
+        self._volume_history = np.zeros((sites, 0))
+
+        # start slot (-1 if none) and running severity of each site's open event of each kind
+        self._open = {
+            kind: (np.full(sites, -1, dtype=np.int64), np.zeros(sites))
+            for kind in (CONGESTION, DEAD_SENSOR)
+        }
+
+    def append(self, speeds: np.ndarray, volumes: np.ndarray) -> List[Event]:
+        """
+        Adds the next slots of speed and volume, sites by slots with NaN for gaps, and returns the events that ended within them.
+        """
+        if speeds.shape != volumes.shape or speeds.shape[0] != len(self.site_ids):
+            raise ValueError(
+                f"Speeds and volumes must both have {len(self.site_ids)} rows and the same shape"
+            )
+
+        if not speeds.shape[1]:
+            return []
+
+        speed_baseline = _trailing_mean(self._speed_history, speeds, self.window)
+        volume_baseline = _trailing_mean(self._volume_history, volumes, self.window)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drop = 1 - speeds / speed_baseline
+            congested = (
+                (drop >= self.speed_drop)
+                & (volumes >= self.volume_ratio * volume_baseline)
+                & (volume_baseline > 0)
+            )
+        dead = np.isnan(speeds) & np.isnan(volumes)
+
+        # severity is the fractional speed drop for congestion and hours missing for dead sensors
+        events = self._update_runs(CONGESTION, congested, np.nan_to_num(drop))
+        events += self._update_runs(
+            DEAD_SENSOR, dead, np.full(speeds.shape, SLOT_SECONDS / 3600)
+        )
+
+        self._slot += speeds.shape[1]
+        self._speed_history = np.hstack([self._speed_history, speeds])[
+            :, -self.window :
+        ]
+        self._volume_history = np.hstack([self._volume_history, volumes])[
+            :, -self.window :
+        ]
+
+        return sorted(events, key=lambda event: (event.start, event.site_id))
+
+    def open_events(self) -> List[Event]:
+        """
+        Returns the events still in progress at the latest slot, including ones not yet long enough to be reported when they end.
+        """
+        events = []
+        for kind, (starts, severities) in self._open.items():
+            for row in np.nonzero(starts >= 0)[0]:
+                events.append(
+                    self._event(
+                        row, kind, starts[row], self._slot, severities[row], True
+                    )
+                )
+        return events
+
+    def flush(self) -> List[Event]:
+        """
+        Ends every open event at the latest slot and returns those long enough to report.
+        """
+        events = []
+        for kind, (starts, severities) in self._open.items():
+            for row in np.nonzero(starts >= 0)[0]:
+                if self._slot - starts[row] >= self._min_length(kind):
+                    events.append(
+                        self._event(row, kind, starts[row], self._slot, severities[row])
+                    )
+            starts[:] = -1
+            severities[:] = 0
+        return sorted(events, key=lambda event: (event.start, event.site_id))
+
+    def _update_runs(
+        self, kind: str, mask: np.ndarray, severity: np.ndarray
+    ) -> List[Event]:
+        """
+        Extends, closes, and opens runs of the given kind from a block of flagged slots, returning events that closed and are long enough.
+        """
+        starts, severities = self._open[kind]
+        slots = mask.shape[1]
+        events = []
+
+        # open runs that do not continue into this block end where it starts
+        for row in np.nonzero((starts >= 0) & ~mask[:, 0])[0]:
+            if self._slot - starts[row] >= self._min_length(kind):
+                events.append(
+                    self._event(row, kind, starts[row], self._slot, severities[row])
+                )
+
+        next_starts = np.full(len(starts), -1, dtype=np.int64)
+        next_severities = np.zeros(len(starts))
+
+        for row, start, end in _runs(mask):
+            run_start = self._slot + start
+            run_severity = float(
+                severity[row, start:end].sum()
+                if kind == DEAD_SENSOR
+                else severity[row, start:end].max()
+            )
+            if start == 0 and starts[row] >= 0:
+                run_start = starts[row]
+                if kind == DEAD_SENSOR:
+                    run_severity += severities[row]
+                else:
+                    run_severity = max(run_severity, severities[row])
+
+            if end == slots:
+                next_starts[row] = run_start
+                next_severities[row] = run_severity
+            elif self._slot + end - run_start >= self._min_length(kind):
+                events.append(
+                    self._event(row, kind, run_start, self._slot + end, run_severity)
+                )
+
+        starts[:] = next_starts
+        severities[:] = next_severities
+        return events
+
+    def _min_length(self, kind: str) -> int:
+        """
+        Returns the minimum number of slots an event of the given kind must last to be reported.
+        """
+        return self.min_congestion if kind == CONGESTION else self.min_dead
+
+    def _event(
+        self,
+        row: int,
+        kind: str,
+        start: int,
+        end: int,
+        severity: float,
+        ongoing: bool = False,
+    ) -> Event:
+        """
+        Creates an Event for a grid row from its start and end slots.
+        """
+        return Event(
+            site_id=self.site_ids[row],
+            kind=kind,
+            start=self.origin + timedelta(seconds=int(start) * SLOT_SECONDS),
+            end=self.origin + timedelta(seconds=int(end) * SLOT_SECONDS),
+            severity=float(severity),
+            ongoing=ongoing,
+        )
+
+
+def detect_events(
+    site_ids: Sequence[int],
+    speeds: np.ndarray,
+    volumes: np.ndarray,
+    start: date | datetime,
+    **settings,
+) -> List[Event]:
+    """
+    Returns every congestion and dead sensor event in complete speed and volume grids, such as those from analytics.align_sites.
+    """
+    detector = EventDetector(site_ids, start, **settings)
+    events = detector.append(speeds, volumes) + detector.flush()
+    return sorted(events, key=lambda event: (event.start, event.site_id))
+
+
+def _trailing_mean(history: np.ndarray, new: np.ndarray, window: int) -> np.ndarray:
+    """
+    Returns, for each new slot, the mean of the valid values in the window slots before it, NaN if fewer than half of them are valid.
+    """
+    values = np.hstack([history, new])
+    valid = ~np.isnan(values)
+
+    # cumulative sums with a leading zero column, so any window sum is a difference
+    sums = np.zeros((values.shape[0], values.shape[1] + 1))
+    counts = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(np.where(valid, values, 0), axis=1, out=sums[:, 1:])
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    positions = np.arange(history.shape[1], values.shape[1])
+    lower = np.maximum(positions - window, 0)
+    window_sums = sums[:, positions] - sums[:, lower]
+    window_counts = counts[:, positions] - counts[:, lower]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = window_sums / window_counts
+    mean[window_counts < max(1, window // 2)] = np.nan
+    return mean
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int, int]]:
+    """
+    Returns the (row, start, end) of every run of True values in a boolean matrix, with end exclusive.
+    """
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    changes = np.diff(padded, axis=1)
+
+    # nonzero walks rows in order, so the nth start matches the nth end
+    rows, starts = np.nonzero(changes == 1)
+    _, ends = np.nonzero(changes == -1)
+    return list(zip(rows.tolist(), starts.tolist(), ends.tolist()))
@@ -0,0 +1,161 @@
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterable
+
+from columns import MISSING, ObservationColumns
+
+if TYPE_CHECKING:
+    from webtris_client import SingleSite
+
+# date ordinal of 1970-01-01, NumPy and Arrow count days from here
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# formats accepted by export_sites
+EXPORT_FORMATS = ("numpy", "pandas", "arrow")
+
+
+def to_numpy(columns: ObservationColumns) -> Dict[str, Any]:
+    """
+    Exports columns as NumPy arrays, with speed and volume as read-only masked arrays sharing the column buffers and missing data masked.
+    """
+    import numpy as np
+
+    ordinals = _column_view(columns.report_dates)
+    times = _column_view(columns.times)
+    avg_speeds = _column_view(columns.avg_speeds)
+    total_volumes = _column_view(columns.total_volumes)
+
+    return {
+        "report_date": (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]"),
+        "time_period_ending": times.astype("timedelta64[s]"),
+        "avg_speed": np.ma.masked_array(avg_speeds, mask=avg_speeds == MISSING),
+        "total_volume": np.ma.masked_array(
+            total_volumes, mask=total_volumes == MISSING
+        ),
+    }
+
+
+def to_pandas(columns: ObservationColumns, site_id: int | None = None) -> Any:
+    """
+    Exports columns as a pandas DataFrame, with nullable integer speed and volume columns sharing the column buffers read-only and missing data as NA.
+    """
+    import numpy as np
+    import pandas as pd
+
+    arrays = to_numpy(columns)
+    data = {
+        "site_name": pd.Categorical([columns.site_name] * len(columns)),
+        "report_date": arrays["report_date"].astype("datetime64[s]"),
+        "time_period_ending": arrays["time_period_ending"],
+        "avg_speed": pd.arrays.IntegerArray(
+            arrays["avg_speed"].data, np.ma.getmaskarray(arrays["avg_speed"])
+        ),
+        "total_volume": pd.arrays.IntegerArray(
+            arrays["total_volume"].data, np.ma.getmaskarray(arrays["total_volume"])
+        ),
+    }
+    if site_id is not None:
+        data = {"site_id": np.full(len(columns), site_id), **data}
+
+    return pd.DataFrame(data, copy=False)
+
+
+def to_arrow(columns: ObservationColumns, site_id: int | None = None) -> Any:
+    """
+    Exports columns as a pyarrow Table, with time, speed, and volume arrays sharing the column buffers and missing data marked as null.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    length = len(columns)
+    days = np.frombuffer(columns.report_dates, dtype=np.intc) - _EPOCH_ORDINAL
+
+    data = {
+        "site_name": pa.DictionaryArray.from_arrays(
+            pa.array(np.zeros(length, dtype=np.int32)), pa.array([columns.site_name])
+        ),
+        "report_date": pa.Array.from_buffers(
+            pa.date32(), length, [None, pa.py_buffer(days.astype(np.int32))]
+        ),
+        "time_period_ending": pa.Array.from_buffers(
+            pa.time32("s"), length, [None, pa.py_buffer(columns.times)]
+        ),
+        "avg_speed": _arrow_int_column(columns.avg_speeds),
+        "total_volume": _arrow_int_column(columns.total_volumes),
+    }
+    if site_id is not None:
+        data = {"site_id": pa.repeat(pa.scalar(site_id, pa.int64()), length), **data}
+
+    return pa.table(data)
+
+
+def export_sites(sites: Iterable["SingleSite"], format: str = "pandas") -> Any:
+    """
+    Exports many sites to one combined result with a site_id column, a dict of arrays for numpy, a DataFrame for pandas, or a Table for arrow.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of {EXPORT_FORMATS}, got {format}")
+
+    sites = list(sites)
+
+    if format == "arrow":
+        import pyarrow as pa
+
+        # arrow tables are concatenated as chunks, so no columns are copied
+        tables = [to_arrow(site.to_columns(), site.site_id) for site in sites]
+        return pa.concat_tables(tables or [to_arrow(ObservationColumns(""), 0)])
+
+    if format == "pandas":
+        import pandas as pd
+
+        frames = [to_pandas(site.to_columns(), site.site_id) for site in sites]
+        return pd.concat(
+            frames or [to_pandas(ObservationColumns(""), 0)], ignore_index=True
+        )
+
+    import numpy as np
+
+    exports = [to_numpy(site.to_columns()) for site in sites]
+    site_ids = [
+        np.full(len(export["report_date"]), site.site_id, dtype=np.int64)
+        for site, export in zip(sites, exports)
+    ]
+    if not exports:
+        exports = [to_numpy(ObservationColumns(""))]
+        site_ids = [np.zeros(0, dtype=np.int64)]
+
+    combined = {"site_id": np.concatenate(site_ids)}
+    for name, array in exports[0].items():
+        concatenate = (
+            np.ma.concatenate if np.ma.isMaskedArray(array) else np.concatenate
+        )
+        combined[name] = concatenate([export[name] for export in exports])
+    return combined
+
+
+def _column_view(column: Any) -> Any:
+    """
+    Returns a read-only NumPy view of an integer column buffer, so changing an export cannot change the site it came from.
+    """
+    import numpy as np
+
+    values = np.frombuffer(column, dtype=np.intc)
+    values.flags.writeable = False
+    return values
+
+
+def _arrow_int_column(column: Any) -> Any:
+    """
+    Wraps an integer column buffer as a pyarrow int32 array, with a validity bitmap marking MISSING values as null.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    values = _column_view(column)
+    valid = values != MISSING
+    validity = None
+    if not valid.all():
+        validity = pa.py_buffer(np.packbits(valid, bitorder="little"))
+
+    return pa.Array.from_buffers(
+        pa.int32(), len(values), [validity, pa.py_buffer(column)]
+    )
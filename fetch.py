@@ -0,0 +1,204 @@
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Set
+
+from webtris_client import APIClient, APIConnector, Observation, SingleSite
+
+
+class FetchResult:
+    """
+    The outcome of fetching one site-day, holding either its observations or the error that stopped it.
+    """
+
+    # required attributes
+    site_id: int
+    date: str
+    observations: List[Observation] | None
+    error: Exception | None
+
+    def __init__(
+        self,
+        site_id: int,
+        date: str,
+        observations: List[Observation] | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """
+        Creates a FetchResult for a site and DDMMYYYY date with its observations, or the error raised while fetching them.
+        """
+        self.site_id = site_id
+        self.date = date
+        self.observations = observations
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns True if the site-day was fetched without an error.
+        """
+        return self.error is None
+
+    def result(self) -> List[Observation]:
+        """
+        Returns the observations, raising the error instead if the fetch failed.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.observations
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the result including its site, date, and outcome.
+        """
+        outcome = (
+            f"error={self.error!r}"
+            if self.error is not None
+            else f"observations={len(self.observations)}"
+        )
+        return f"FetchResult(site={self.site_id}, date={self.date}, {outcome})"
+
+
+class ThreadedFetcher:
+    """
+    Fetches many site-days on a pool of threads that share one APIClient, and so one pooled connector, for callers that cannot use asyncio.
+    """
+
+    # required attributes
+    client: APIClient
+    workers: int
+
+    def __init__(
+        self,
+        client: APIClient | None = None,
+        workers: int = 8,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Creates a ThreadedFetcher with a number of worker threads, using the given client or one whose connector pools a connection per worker.
+        """
+        if workers < 1:
+            raise ValueError(f"Workers must be at least 1, got {workers}")
+
+        self._owns_client = client is None
+        if client is None:
+            client = APIClient(
+                connector=APIConnector(timeout=timeout, pool_size=workers)
+            )
+        self.client = client
+        self.workers = workers
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="webtris-fetch"
+        )
+        self._cancelled = threading.Event()
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Returns True if cancel has been called.
+        """
+        return self._cancelled.is_set()
+
+    def fetch_many(
+        self,
+        site_ids: Iterable[int],
+        dates: Iterable[str],
+        sites: Dict[int, SingleSite] | None = None,
+    ) -> Iterator[FetchResult]:
+        """
+        Fetches every combination of site and DDMMYYYY date, yielding a FetchResult as each one finishes, and adds the new intervals to any matching SingleSite in sites.
+        """
+        dates = list(dates)
+        site_days = ((site_id, date) for site_id in site_ids for date in dates)
+
+        # only one fetch per worker is in flight, so results are never held for the whole job
+        pending: Set[Future] = set()
+        try:
+            while True:
+                with self._lock:
+                    if self.cancelled:
+                        return
+                    for site_id, date in itertools.islice(
+                        site_days, self.workers - len(pending)
+                    ):
+                        future = self._pool.submit(self._fetch, site_id, date, sites)
+                        pending.add(future)
+                        self._futures.add(future)
+
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                with self._lock:
+                    self._futures.difference_update(done)
+
+                for future in done:
+                    if self.cancelled:
+                        return
+                    if not future.cancelled():
+                        yield future.result()
+        finally:
+            # stop work nobody will read, for example when the caller breaks out early
+            for future in pending:
+                future.cancel()
+            with self._lock:
+                self._futures.difference_update(pending)
+
+    def cancel(self) -> None:
+        """
+        Cancels every fetch that has not started, from any thread, fetches already running finish but are no longer yielded.
+        """
+        with self._lock:
+            self._cancelled.set()
+            for future in self._futures:
+                future.cancel()
+
+    def close(self) -> None:
+        """
+        Cancels fetches that have not started, waits for running ones, and closes the connector if this fetcher created it.
+        """
+        self._pool.shutdown(cancel_futures=True)
+        if self._owns_client:
+            self.client.connector.close()
+
+    def _fetch(
+        self, site_id: int, date: str, sites: Dict[int, SingleSite] | None
+    ) -> FetchResult:
+        """
+        Fetches one site-day in a worker thread, catching any error so it is reported for that site-day alone.
+        """
+        try:
+            observations = self.client.get_daily_data(site_id, date)
+            if sites is not None and site_id in sites:
+                sites[site_id].append_observations(observations)
+        except Exception as e:
+            return FetchResult(site_id, date, error=e)
+        return FetchResult(site_id, date, observations=observations)
+
+    def __enter__(self) -> "ThreadedFetcher":
+        """
+        Allows ThreadedFetcher to be used as a context manager that closes it on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the fetcher when leaving a with block.
+        """
+        self.close()
+
+
+def fetch_many(
+    site_ids: Iterable[int],
+    dates: Iterable[str],
+    workers: int = 8,
+    client: APIClient | None = None,
+    sites: Dict[int, SingleSite] | None = None,
+) -> Iterator[FetchResult]:
+    """
+    Fetches every combination of site and DDMMYYYY date on a pool of worker threads, yielding a FetchResult in completion order, closing the generator cancels the fetches not yet started.
+    """
+    with ThreadedFetcher(client=client, workers=workers) as fetcher:
+        yield from fetcher.fetch_many(site_ids, dates, sites)
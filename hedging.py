@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Deque
+
+from webtris_client import APIConnectionError, APIConnector, APIResponse
+
+if TYPE_CHECKING:
+    from response_cache import ResponseCache
+
+
+class HedgeStats:
+    """
+    Counts requests, hedges sent, and how often the hedge answered before the original request.
+    """
+
+    # required attributes
+    requests: int
+    hedges: int
+    hedge_wins: int
+
+    def __init__(self) -> None:
+        """
+        Creates HedgeStats with every count set to zero.
+        """
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def win_rate(self) -> float | None:
+        """
+        Returns the fraction of hedges that answered first, returns None if no hedges have been sent.
+        """
+        if not self.hedges:
+            return None
+        return self.hedge_wins / self.hedges
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the stats including all counts.
+        """
+        return f"HedgeStats(requests={self.requests}, hedges={self.hedges}, hedge_wins={self.hedge_wins})"
+
+
+class HedgedConnector(APIConnector):
+    """
+    An APIConnector that sends a duplicate request when the original is slower than a percentile of recent latency, and returns whichever answers first.
+    """
+
+    # required attributes
+    percentile: float
+    budget: float
+    min_samples: int
+    hedge_stats: HedgeStats
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        cache: "ResponseCache | None" = None,
+        pool_size: int | None = None,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int | None = None,
+    ) -> None:
+        """
+        Creates a HedgedConnector that hedges after the given latency percentile, sending at most budget extra requests per request, once min_samples latencies from the last window requests are known, with the same timeout, cache, and pool size options as APIConnector, requests run on max_workers threads, two per pooled connection by default.
+        """
+        super().__init__(timeout=timeout, cache=cache, pool_size=pool_size)
+
+        if not (0 < percentile < 100):
+            raise ValueError(f"Percentile must be between 0 and 100, got {percentile}")
+        if not (0 <= budget <= 1):
+            raise ValueError(f"Budget must be between 0 and 1, got {budget}")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.hedge_stats = HedgeStats()
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        # room for a request and its hedge from every caller sharing the connection pool
+        if max_workers is None:
+            max_workers = 32 if pool_size is None else 2 * pool_size
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="webtris-hedge"
+        )
+
+    def hedge_delay(self) -> float | None:
+        """
+        Returns how long to wait before hedging, the chosen percentile of recent latency, returns None until enough latencies are known.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return latencies[index]
+
+    def get_response(self, url: str) -> APIResponse:
+        """
+        Makes a get request to the API, hedging with a duplicate request if it is slow and the budget allows, and returns the first successful response.
+        """
+        with self._lock:
+            self.hedge_stats.requests += 1
+
+        # nothing to hedge against yet, so the request is sent from the caller's thread
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed_response(url)
+
+        started = threading.Event()
+        primary = self._pool.submit(self._timed_response, url, started)
+
+        # time spent queued for a thread does not count towards the hedge delay
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        hedge = self._pool.submit(self._timed_response, url)
+        return self._first_success(primary, hedge)
+
+    def close(self) -> None:
+        """
+        Shuts down the threads used to send requests and closes any pooled connections.
+        """
+        self._pool.shutdown(wait=False)
+        super().close()
+
+    def _take_hedge(self) -> bool:
+        """
+        Returns True and counts a hedge if sending one keeps hedges within the budget.
+        """
+        with self._lock:
+            if self.hedge_stats.hedges + 1 > self.budget * self.hedge_stats.requests:
+                return False
+            self.hedge_stats.hedges += 1
+            return True
+
+    def _first_success(self, primary: Future, hedge: Future) -> APIResponse:
+        """
+        Returns the first successful response of the original and hedged requests, connection errors only raise once both requests have failed.
+        """
+        pending = {primary, hedge}
+        first_error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except APIConnectionError as e:
+                    first_error = first_error or e
+                    continue
+
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_stats.hedge_wins += 1
+                return response
+
+        raise first_error
+
+    def _timed_response(
+        self, url: str, started: threading.Event | None = None
+    ) -> APIResponse:
+        """
+        Makes a single get request and records its latency if it succeeds, setting started once the request is sent if an event is given.
+        """
+        if started is not None:
+            started.set()
+        start = time.perf_counter()
+        response = super().get_response(url)
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return response
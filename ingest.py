@@ -0,0 +1,169 @@
+import json
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from columns import ObservationColumns
+from rollups import SiteRollups
+from webtris_client import APIClient, SingleSite
+
+if TYPE_CHECKING:
+    from site_store import SiteStore
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # platforms without shared memory fall back to plain bytes
+    shared_memory = None
+
+
+# result sent back from a worker, either ("shm", block name) or ("bytes", packed columns)
+ParseResult = Tuple[str, str | bytes]
+
+
+def parse_payload(raw: bytes, use_shared_memory: bool = True) -> ParseResult:
+    """
+    Parses a raw API response body into sorted columns inside a worker process, returning them packed in shared memory where available.
+    """
+    columns = ObservationColumns.from_json_response(json.loads(raw))
+    columns.sort()
+
+    if use_shared_memory and shared_memory is not None:
+        try:
+            block = shared_memory.SharedMemory(
+                create=True, size=max(columns.packed_size(), 1)
+            )
+        except OSError:
+            pass  # e.g. /dev/shm is full or unavailable, send the bytes instead
+        else:
+            # the parent owns and unlinks the block, so this worker's tracker must not
+            resource_tracker.unregister(block._name, "shared_memory")
+            columns.pack_into(block.buf)
+            name = block.name
+            block.close()  # the parent process unlinks the block once it is read
+            return ("shm", name)
+
+    return ("bytes", columns.to_bytes())
+
+
+def load_result(result: ParseResult) -> ObservationColumns:
+    """
+    Rebuilds columns from a worker result, releasing any shared memory block it used.
+    """
+    kind, payload = result
+    if kind == "bytes":
+        return ObservationColumns.from_bytes(payload)
+
+    block = shared_memory.SharedMemory(name=payload)
+    try:
+        return ObservationColumns.from_bytes(block.buf)
+    finally:
+        block.close()
+        block.unlink()
+
+
+class BulkIngest:
+    """
+    Parses raw API responses into ObservationColumns across a pool of worker processes, so parsing is not limited to one core.
+    """
+
+    # required attributes
+    workers: int
+    use_shared_memory: bool
+
+    def __init__(
+        self, workers: int | None = None, use_shared_memory: bool = True
+    ) -> None:
+        """
+        Creates a BulkIngest with the number of worker processes, defaulting to one per CPU core, and whether to return results through shared memory.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.use_shared_memory = use_shared_memory
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, raw: bytes) -> Future:
+        """
+        Submits a raw API response body for parsing and returns a future for the worker result, to be passed to load_result.
+        """
+        return self._pool.submit(parse_payload, raw, self.use_shared_memory)
+
+    def parse_many(self, payloads: Iterable[bytes]) -> List[ObservationColumns]:
+        """
+        Parses many raw API response bodies in parallel and returns their columns in the same order.
+        """
+        return list(self.iter_parse(payloads))
+
+    def iter_parse(self, payloads: Iterable[bytes]) -> Iterator[ObservationColumns]:
+        """
+        Parses many raw API response bodies in parallel, yielding their columns in the same order as the payloads.
+        """
+        futures = [self.submit(raw) for raw in payloads]
+        read = 0
+        try:
+            for future in futures:
+                read += 1
+                yield load_result(future.result())
+        finally:
+            # release shared memory held by results that were never read
+            for future in futures[read:]:
+                if future.cancel():
+                    continue
+                if future.exception() is None:
+                    load_result(future.result())
+
+    def ingest_sites(
+        self, client: APIClient, site_ids: Iterable[int], date: str
+    ) -> Dict[int, ObservationColumns]:
+        """
+        Gets the raw daily data for each site and parses it in the pool while the remaining sites are still being fetched.
+        """
+        client.check_date_format(date)
+
+        site_ids = list(site_ids)
+        payloads = (
+            client.connector.make_raw_request(client.make_url(site_id, date, date))
+            for site_id in site_ids
+        )
+        return dict(zip(site_ids, self.iter_parse(payloads)))
+
+    def load_sites(
+        self,
+        client: APIClient,
+        site_ids: Iterable[int],
+        date: str,
+        store: "SiteStore | None" = None,
+    ) -> Dict[int, SingleSite]:
+        """
+        Ingests the daily data for each site into a SingleSite, with rollups loaded from the connector if it saved them, such as an ArchiveConnector, or computed once from the parsed columns.
+        """
+        load_rollups = getattr(client.connector, "load_rollups", None)
+
+        sites = {}
+        for site_id, columns in self.ingest_sites(client, site_ids, date).items():
+            rollups = None
+            if load_rollups is not None:
+                rollups = load_rollups(client.make_url(site_id, date, date))
+            if rollups is None:
+                rollups = SiteRollups.from_columns(columns)
+
+            site = SingleSite(site_id=site_id, site_name="", store=store)
+            site.load_columns(columns, rollups)
+            sites[site_id] = site
+        return sites
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes, waiting for any submitted work to finish.
+        """
+        self._pool.shutdown()
+
+    def __enter__(self) -> "BulkIngest":
+        """
+        Allows BulkIngest to be used as a context manager that closes the pool on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the pool when leaving a with block.
+        """
+        self.close()
@@ -1,16 +1,256 @@
-from webtris_client import APIClient, APIConnector, SingleSite
-
-connector = APIConnector()
-client = APIClient(connector=connector)
-site = SingleSite(site_id=461, site_name="Example Site")
-day = "01"
-month = "01"
-year = "2024"
-date = day + month + year
-site.get_data(client, date)
-print(f"Average speed for {date}: {site.calculate_avg_speed()}")
-print(f"Total volume for {date}: {site.calculate_total_volume()}")
-hour = site.find_peak_hour()
-print(f"Peak hour: {hour}")
-print(f"Average speed for hour {hour}: {site.calculate_avg_speed_for_hour(hour)}")
-print(f"Total volume for hour {hour}: {site.calculate_total_volume_for_hour(hour)}")
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, TextIO
+
+from fetch import FetchResult, ThreadedFetcher
+from response_cache import ResponseCache
+from webtris_client import APIClient, APIConnector, SingleSite, TransferStats
+
+# columns written for each output mode
+INTERVAL_FIELDS = [
+    "site_id",
+    "site_name",
+    "report_date",
+    "time_period_ending",
+    "avg_speed",
+    "total_volume",
+]
+SUMMARY_FIELDS = [
+    "site_id",
+    "site_name",
+    "report_date",
+    "intervals",
+    "avg_speed",
+    "total_volume",
+    "peak_hour",
+]
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Fetch WebTRIS daily traffic data for many sites and dates, streaming rows as JSONL or CSV."
+    )
+    parser.add_argument("sites", nargs="*", type=int, help="site IDs to fetch")
+    parser.add_argument(
+        "--sites-file", help="file with one site ID per line, '-' for stdin"
+    )
+    parser.add_argument("--start", required=True, help="first date, DDMMYYYY")
+    parser.add_argument("--end", help="last date, DDMMYYYY, defaults to --start")
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="number of parallel requests"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["summary", "intervals"],
+        default="summary",
+        help="one row per site-day, or one row per 15 minute interval",
+    )
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--output", help="file to write rows to, defaults to stdout")
+    parser.add_argument(
+        "--timeout", type=float, default=30, help="request timeout in seconds"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory to cache responses in, unchanged pages are revalidated instead of downloaded",
+    )
+
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error(f"--concurrency must be at least 1, got {args.concurrency}")
+    return args
+
+
+def read_site_ids(args: argparse.Namespace) -> List[int]:
+    """
+    Returns the site IDs given on the command line followed by any in the sites file, raising a ValueError if there are none.
+    """
+    site_ids = list(args.sites)
+
+    if args.sites_file:
+        file = sys.stdin if args.sites_file == "-" else open(args.sites_file)
+        with file:
+            for line in file:
+                line = line.split("#")[0].strip()  # allow comments and blank lines
+                if line:
+                    site_ids.append(int(line))
+
+    if not site_ids:
+        raise ValueError("No site IDs given")
+    return site_ids
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """
+    Returns every date from start to end inclusive in DDMMYYYY format, raises a ValueError if the range is invalid.
+    """
+    try:
+        first = datetime.strptime(start, "%d%m%Y")
+        last = datetime.strptime(end, "%d%m%Y")
+    except ValueError:
+        raise ValueError(f"Invalid date range: {start} to {end}")
+    if last < first:
+        raise ValueError(f"End date {end} is before start date {start}")
+
+    return [
+        (first + timedelta(days=offset)).strftime("%d%m%Y")
+        for offset in range((last - first).days + 1)
+    ]
+
+
+def site_from_result(result: FetchResult) -> SingleSite:
+    """
+    Builds a SingleSite from the observations of a fetched site-day.
+    """
+    site = SingleSite(site_id=result.site_id, site_name="")
+    site.observations = result.result()
+    if site.observations:
+        site.site_name = site.observations[0].site_name
+    return site
+
+
+def site_rows(site: SingleSite, date: str, mode: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the output rows for a fetched site-day, either a single summary row or one row per interval.
+    """
+    if mode == "summary":
+        yield {
+            "site_id": site.site_id,
+            "site_name": site.site_name,
+            "report_date": datetime.strptime(date, "%d%m%Y").date().isoformat(),
+            "intervals": len(site),
+            "avg_speed": site.calculate_avg_speed(),
+            "total_volume": site.calculate_total_volume(),
+            "peak_hour": site.find_peak_hour(),
+        }
+        return
+
+    for observation in site:
+        yield {
+            "site_id": site.site_id,
+            "site_name": observation.site_name,
+            "report_date": observation.report_date.isoformat(),
+            "time_period_ending": observation.time_period_ending.isoformat(),
+            "avg_speed": observation.avg_speed,
+            "total_volume": observation.total_volume,
+        }
+
+
+class RowWriter:
+    """
+    Writes rows to a stream as JSON lines or CSV, flushing after each site-day so output arrives as data is fetched.
+    """
+
+    def __init__(self, stream: TextIO, format: str, fields: List[str]) -> None:
+        """
+        Creates a RowWriter for the stream, output format, and CSV columns, writing the CSV header straight away.
+        """
+        self.stream = stream
+        self.format = format
+        self.rows = 0
+        self._csv = None
+        if format == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=fields)
+            self._csv.writeheader()
+
+    def write(self, rows: Iterator[Dict[str, Any]]) -> None:
+        """
+        Writes rows to the stream and flushes it.
+        """
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self.stream.write(json.dumps(row) + "\n")
+            self.rows += 1
+        self.stream.flush()
+
+
+def run(
+    client: APIClient,
+    site_ids: List[int],
+    dates: List[str],
+    writer: RowWriter,
+    mode: str,
+    concurrency: int,
+) -> int:
+    """
+    Fetches every site-day in parallel and writes rows as each one finishes, returns the number of site-days that failed.
+    """
+    errors = 0
+    total = len(site_ids) * len(dates)
+    report_every = max(1, total // 10)  # about ten progress lines per run
+    with ThreadedFetcher(client=client, workers=concurrency) as fetcher:
+        for done, result in enumerate(fetcher.fetch_many(site_ids, dates), start=1):
+            if result.ok:
+                writer.write(site_rows(site_from_result(result), result.date, mode))
+            else:
+                errors += 1
+                print(
+                    f"Error for site {result.site_id} on {result.date}: {result.error}",
+                    file=sys.stderr,
+                )
+
+            if done % report_every == 0 and done < total:
+                print(f"Progress: {done}/{total} site-days", file=sys.stderr)
+    return errors
+
+
+def main(argv: List[str] | None = None, client: APIClient | None = None) -> int:
+    """
+    Runs the command line tool and returns the exit code, 1 if any site-day failed.
+    """
+    args = parse_args(argv)
+    try:
+        site_ids = read_site_ids(args)
+        dates = date_range(args.start, args.end or args.start)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if client is None:
+        cache = ResponseCache(args.cache_dir) if args.cache_dir else None
+        client = APIClient(
+            connector=APIConnector(
+                timeout=args.timeout, cache=cache, pool_size=args.concurrency
+            )
+        )
+    site_days = len(site_ids) * len(dates)
+    fields = SUMMARY_FIELDS if args.mode == "summary" else INTERVAL_FIELDS
+
+    stream = open(args.output, "w", newline="") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        writer = RowWriter(stream, args.format, fields)
+        errors = run(client, site_ids, dates, writer, args.mode, args.concurrency)
+    finally:
+        if args.output:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    # progress and throughput go to stderr so they never mix with the rows
+    print(
+        f"Fetched {site_days - errors}/{site_days} site-days, "
+        f"{writer.rows} rows in {elapsed:.2f}s "
+        f"({site_days / elapsed if elapsed else 0:.1f} site-days/s)",
+        file=sys.stderr,
+    )
+    stats = getattr(client.connector, "stats", None)
+    if isinstance(stats, TransferStats):
+        print(
+            f"Transferred {stats.wire_bytes} bytes for {stats.decoded_bytes} decoded, "
+            f"{stats.not_modified}/{stats.requests} requests unchanged since cached",
+            file=sys.stderr,
+        )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
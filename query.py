@@ -0,0 +1,399 @@
+import gzip
+import json
+import operator
+import os
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+
+from codec import decode_site_day
+from columns import FIELDS, MISSING, ObservationColumns
+from site_store import SiteStore
+
+# a block of observations for one site, as yielded by a source's scan
+Block = Tuple[int, ObservationColumns]
+
+# comparison operators accepted by Query.where, applied to whole columns at once
+OPERATORS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# keys that results can be grouped by
+GROUP_KEYS = ("site", "day", "hour")
+
+# aggregate functions that can be applied to a field
+AGGREGATES = ("sum", "mean", "count", "max", "min")
+
+
+class ColumnsSource:
+    """
+    Serves queries from ObservationColumns held in memory, skipping blocks outside the requested sites and dates.
+    """
+
+    def __init__(self, blocks: Dict[int, List[ObservationColumns]]) -> None:
+        """
+        Creates a ColumnsSource from lists of ObservationColumns keyed by site ID.
+        """
+        self.blocks = blocks
+
+    def scan(
+        self, site_ids: Set[int] | None, start: date | None, end: date | None
+    ) -> Iterator[Block]:
+        """
+        Yields the blocks of the requested sites that may contain dates in the requested range.
+        """
+        for site_id, site_blocks in self.blocks.items():
+            if site_ids is not None and site_id not in site_ids:
+                continue
+            for columns in site_blocks:
+                if not len(columns):
+                    continue
+                first = date.fromordinal(min(columns.report_dates))
+                last = date.fromordinal(max(columns.report_dates))
+                if _overlaps(first, last, start, end):
+                    yield site_id, columns
+
+
+class SiteStoreSource:
+    """
+    Serves queries from a SiteStore, only reloading the site-days that match the requested sites and dates.
+    """
+
+    def __init__(self, store: SiteStore) -> None:
+        """
+        Creates a SiteStoreSource for a SiteStore.
+        """
+        self.store = store
+
+    def scan(
+        self, site_ids: Set[int] | None, start: date | None, end: date | None
+    ) -> Iterator[Block]:
+        """
+        Yields a block for each stored site-day of the requested sites within the requested range.
+        """
+        for site_id, report_date in sorted(self.store.keys()):
+            if site_ids is not None and site_id not in site_ids:
+                continue
+            if not _overlaps(report_date, report_date, start, end):
+                continue
+            yield site_id, ObservationColumns.from_observations(
+                self.store.get(site_id, report_date)
+            )
+
+
+class ArchiveSource:
+    """
+    Serves queries from an ArchiveConnector directory, choosing files by the site and dates in their names so other files are never opened.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Creates an ArchiveSource for an archive directory.
+        """
+        self.path = path
+
+    def scan(
+        self, site_ids: Set[int] | None, start: date | None, end: date | None
+    ) -> Iterator[Block]:
+        """
+        Yields a block for each archived response of the requested sites whose date range overlaps the requested range.
+        """
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith(".json.gz"):
+                stem = name[: -len(".json.gz")]
+            elif name.endswith(".day"):
+                stem = name[: -len(".day")]  # a compact site-day
+            else:
+                continue
+
+            # archive files are named site_startdate_enddate_page_pagesize
+            parts = stem.split("_")
+            try:
+                site_id = int(parts[0])
+                first = datetime.strptime(parts[1], "%d%m%Y").date()
+                last = datetime.strptime(parts[2], "%d%m%Y").date()
+            except (IndexError, ValueError):
+                continue
+
+            if site_ids is not None and site_id not in site_ids:
+                continue
+            if not _overlaps(first, last, start, end):
+                continue
+
+            if name.endswith(".day"):
+                with open(os.path.join(self.path, name), "rb") as file:
+                    yield site_id, decode_site_day(file.read())
+                continue
+
+            with gzip.open(os.path.join(self.path, name), "rb") as file:
+                yield site_id, ObservationColumns.from_json_response(json.load(file))
+
+
+class Query:
+    """
+    Filters and groups observations from a source, passing the site and date filters down so the source only reads matching blocks.
+    """
+
+    # required attributes
+    source: Any
+    blocks_read: int
+
+    def __init__(self, source: Any) -> None:
+        """
+        Creates a Query over a source with a scan(site_ids, start, end) method, such as ColumnsSource, SiteStoreSource, or ArchiveSource.
+        """
+        self.source = source
+        self.blocks_read = 0
+        self._site_ids: Set[int] | None = None
+        self._start: date | None = None
+        self._end: date | None = None
+        self._window: Tuple[int, int] | None = None
+        self._conditions: List[
+            Tuple[str, Callable[[np.ndarray, int], np.ndarray], int]
+        ] = []
+        self._group_keys: List[str] = []
+        self._aggregates: List[Tuple[str, str]] = []
+
+    def sites(self, site_ids: Iterable[int]) -> "Query":
+        """
+        Only includes observations from the given sites.
+        """
+        self._site_ids = set(site_ids)
+        return self
+
+    def dates(self, start: date | None = None, end: date | None = None) -> "Query":
+        """
+        Only includes observations from start to end inclusive, either may be None for an open range.
+        """
+        if start is not None and end is not None and end < start:
+            raise ValueError(f"End date {end} is before start date {start}")
+        self._start = start
+        self._end = end
+        return self
+
+    def time_window(self, start: time, end: time) -> "Query":
+        """
+        Only includes observations whose time period ends at or after start and before end, wrapping past midnight if end is before start.
+        """
+        self._window = (_seconds(start), _seconds(end))
+        return self
+
+    def where(self, field: str, op: str, value: int) -> "Query":
+        """
+        Only includes observations where the field compares true against the value, observations missing the field are excluded.
+        """
+        if field not in FIELDS:
+            raise ValueError(f"Field must be one of {sorted(FIELDS)}, got {field}")
+        if op not in OPERATORS:
+            raise ValueError(f"Operator must be one of {sorted(OPERATORS)}, got {op}")
+        self._conditions.append((FIELDS[field], OPERATORS[op], value))
+        return self
+
+    def group_by(self, *keys: str) -> "Query":
+        """
+        Groups results by any of "site", "day", and "hour", with no keys all observations form one group.
+        """
+        for key in keys:
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Group key must be one of {GROUP_KEYS}, got {key}")
+        self._group_keys = list(keys)
+        return self
+
+    def aggregate(self, field: str, function: str) -> "Query":
+        """
+        Adds an aggregate of a field to the results, named like "total_volume_sum", missing values are skipped.
+        """
+        if field not in FIELDS:
+            raise ValueError(f"Field must be one of {sorted(FIELDS)}, got {field}")
+        if function not in AGGREGATES:
+            raise ValueError(f"Aggregate must be one of {AGGREGATES}, got {function}")
+        self._aggregates.append((field, function))
+        return self
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Runs the query and returns one row per group, sorted by the group keys, with the group keys and each aggregate.
+        """
+        # running [sum, count, max, min] for each aggregated field in each group
+        groups: Dict[Tuple, Dict[str, List]] = {}
+        fields = sorted({field for field, _ in self._aggregates})
+
+        self.blocks_read = 0
+        for site_id, columns in self.source.scan(
+            self._site_ids, self._start, self._end
+        ):
+            self.blocks_read += 1
+            if not len(columns):
+                continue
+
+            ordinals = np.frombuffer(columns.report_dates, dtype=np.intc)
+            seconds = np.frombuffer(columns.times, dtype=np.intc)
+            rows = self._row_mask(columns, ordinals, seconds)
+            if not rows.any():
+                continue
+
+            keys, inverse = self._group_rows(site_id, ordinals[rows], seconds[rows])
+            totals = {
+                field: _grouped_totals(
+                    np.frombuffer(getattr(columns, FIELDS[field]), dtype=np.intc)[rows],
+                    inverse,
+                    len(keys),
+                )
+                for field in fields
+            }
+
+            # merge this block's per-group totals into the running totals
+            for index, key in enumerate(keys):
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {
+                        field: [0, 0, None, None] for field in fields
+                    }
+                for field in fields:
+                    sums, counts, maxima, minima = totals[field]
+                    if not counts[index]:
+                        continue
+                    running = group[field]
+                    running[0] += int(sums[index])
+                    running[1] += int(counts[index])
+                    maximum, minimum = int(maxima[index]), int(minima[index])
+                    running[2] = (
+                        maximum if running[2] is None else max(running[2], maximum)
+                    )
+                    running[3] = (
+                        minimum if running[3] is None else min(running[3], minimum)
+                    )
+
+        return [self._result_row(key, groups[key]) for key in sorted(groups)]
+
+    def _row_mask(
+        self, columns: ObservationColumns, ordinals: np.ndarray, seconds: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns a boolean mask of the rows in a block that pass the date, time window, and where filters.
+        """
+        mask = np.ones(len(ordinals), dtype=bool)
+        if self._start is not None:
+            mask &= ordinals >= self._start.toordinal()
+        if self._end is not None:
+            mask &= ordinals <= self._end.toordinal()
+        if self._window is not None:
+            mask &= _in_window(seconds, self._window)
+
+        # rows missing a filtered field never match
+        for column, compare, value in self._conditions:
+            values = np.frombuffer(getattr(columns, column), dtype=np.intc)
+            mask &= (values != MISSING) & compare(values, value)
+        return mask
+
+    def _group_rows(
+        self, site_id: int, ordinals: np.ndarray, seconds: np.ndarray
+    ) -> Tuple[List[Tuple], np.ndarray]:
+        """
+        Returns the distinct group keys among the selected rows, in the order given to group_by, and the index of each row's key.
+        """
+        # every key is a small range within a block, so each row's group is one mixed radix code
+        values = {
+            "site": (np.zeros(len(ordinals), dtype=np.int64), site_id, 1),
+            "day": (
+                ordinals.astype(np.int64) - ordinals.min(),
+                int(ordinals.min()),
+                int(ordinals.max() - ordinals.min()) + 1,
+            ),
+            "hour": (seconds.astype(np.int64) // 3600, 0, 24),
+        }
+        codes = np.zeros(len(ordinals), dtype=np.int64)
+        for key in self._group_keys:
+            offsets, _, size = values[key]
+            codes = codes * size + offsets
+
+        present = np.flatnonzero(np.bincount(codes))
+        index = np.zeros(present[-1] + 1, dtype=np.intp)
+        index[present] = np.arange(len(present))
+
+        keys = []
+        for code in present.tolist():
+            key = []
+            for name in reversed(self._group_keys):
+                _, base, size = values[name]
+                key.append(base + code % size)
+                code //= size
+            keys.append(tuple(reversed(key)))
+        return keys, index[codes]
+
+    def _result_row(self, key: Tuple, group: Dict[str, List]) -> Dict[str, Any]:
+        """
+        Builds the output row for a group from its key and running totals.
+        """
+        names = {"site": "site_id", "day": "report_date", "hour": "hour"}
+        row: Dict[str, Any] = {}
+        for name, value in zip(self._group_keys, key):
+            row[names[name]] = date.fromordinal(value) if name == "day" else value
+
+        for field, function in self._aggregates:
+            total, count, maximum, minimum = group[field]
+            row[f"{field}_{function}"] = {
+                "sum": total,
+                "mean": total / count if count else None,
+                "count": count,
+                "max": maximum,
+                "min": minimum,
+            }[function]
+        return row
+
+
+def _overlaps(first: date, last: date, start: date | None, end: date | None) -> bool:
+    """
+    Returns True if the dates from first to last overlap the range from start to end, where None is an open bound.
+    """
+    return (start is None or last >= start) and (end is None or first <= end)
+
+
+def _seconds(value: time) -> int:
+    """
+    Returns the number of seconds since midnight for a time.
+    """
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _in_window(seconds: np.ndarray, window: Tuple[int, int]) -> np.ndarray:
+    """
+    Returns a boolean mask of the seconds since midnight that fall in the window, which wraps past midnight if it ends before it starts.
+    """
+    start, end = window
+    if start <= end:
+        return (seconds >= start) & (seconds < end)
+    return (seconds >= start) | (seconds < end)
+
+
+def _grouped_totals(
+    values: np.ndarray, inverse: np.ndarray, groups: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the sum, count, max, and min of the non-missing values in each group, where inverse gives each value's group.
+    """
+    valid = values != MISSING
+    values = values[valid].astype(np.int64)
+    inverse = inverse[valid]
+
+    # sort the values by group so each group is one contiguous run to reduce
+    order = np.argsort(inverse, kind="stable")
+    values = values[order]
+    counts = np.bincount(inverse, minlength=groups)
+    nonempty = np.flatnonzero(counts)
+    starts = (np.cumsum(counts) - counts)[nonempty]
+
+    sums = np.zeros(groups, dtype=np.int64)
+    maxima = np.zeros(groups, dtype=np.int64)
+    minima = np.zeros(groups, dtype=np.int64)
+    if len(nonempty):
+        sums[nonempty] = np.add.reduceat(values, starts)
+        maxima[nonempty] = np.maximum.reduceat(values, starts)
+        minima[nonempty] = np.minimum.reduceat(values, starts)
+    return sums, counts, maxima, minima
@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+
+class CachedResponse:
+    """
+    A cached response body with the validators needed to revalidate it with a conditional request.
+    """
+
+    # required attributes
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+
+    def __init__(
+        self, body: bytes, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        """
+        Creates a CachedResponse with the response body and its ETag and Last-Modified headers.
+        """
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """
+    Stores response bodies with their ETag and Last-Modified validators, in memory or in a directory so they survive between runs.
+    """
+
+    # required attributes
+    path: str | None
+    max_entries: int
+
+    def __init__(self, path: str | None = None, max_entries: int = 1024) -> None:
+        """
+        Creates a ResponseCache, kept in a directory if a path is given, otherwise in memory holding at most max_entries responses.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def get(self, url: str) -> CachedResponse | None:
+        """
+        Returns the cached response for a URL, or None if it is not cached or its file is truncated or corrupt.
+        """
+        if self.path is None:
+            with self._lock:
+                cached = self._memory.get(url)
+                if cached is not None:
+                    self._memory.move_to_end(url)  # mark as most recently used
+                return cached
+
+        try:
+            with gzip.open(self._file_path(url), "rb") as file:
+                header = json.loads(file.readline())
+                return CachedResponse(
+                    file.read(), header["etag"], header["last_modified"]
+                )
+        except (OSError, EOFError, ValueError, KeyError, TypeError, zlib.error):
+            # missing, truncated, or corrupt files are a miss and are rewritten by put
+            return None
+
+    def put(
+        self, url: str, body: bytes, etag: str | None, last_modified: str | None
+    ) -> None:
+        """
+        Caches a response body with its validators, replacing any existing entry for the URL.
+        """
+        if self.path is None:
+            with self._lock:
+                self._memory[url] = CachedResponse(body, etag, last_modified)
+                self._memory.move_to_end(url)
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+            return
+
+        # the validators are written as a JSON line before the body
+        file_path = self._file_path(url)
+        temporary_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        header = {"url": url, "etag": etag, "last_modified": last_modified}
+        with gzip.open(temporary_path, "wb") as file:
+            file.write(json.dumps(header).encode("utf-8") + b"\n")
+            file.write(body)
+        os.replace(temporary_path, file_path)
+
+    def _file_path(self, url: str) -> str:
+        """
+        Returns the file used to cache a URL.
+        """
+        return os.path.join(
+            self.path, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".gz"
+        )
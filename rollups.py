@@ -0,0 +1,319 @@
+import json
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from columns import ObservationColumns
+    from webtris_client import Observation
+
+
+class RollupTotals:
+    """
+    Running sums and counts of speed and volume for one rollup bucket, such as a site-day or a site-hour.
+    """
+
+    __slots__ = ("speed_sum", "speed_count", "volume_sum", "volume_count", "rows")
+
+    # required attributes
+    speed_sum: int
+    speed_count: int
+    volume_sum: int
+    volume_count: int
+    rows: int
+
+    def __init__(self) -> None:
+        """
+        Creates empty RollupTotals with every sum and count set to zero.
+        """
+        self.speed_sum = 0
+        self.speed_count = 0
+        self.volume_sum = 0
+        self.volume_count = 0
+        self.rows = 0
+
+    def add(self, avg_speed: int | None, total_volume: int | None) -> None:
+        """
+        Adds one 15 minute interval to the totals, skipping missing speed or volume data.
+        """
+        self.rows += 1
+        if avg_speed is not None:
+            self.speed_sum += avg_speed
+            self.speed_count += 1
+        if total_volume is not None:
+            self.volume_sum += total_volume
+            self.volume_count += 1
+
+    def merge(self, other: "RollupTotals") -> None:
+        """
+        Adds another set of totals into these totals.
+        """
+        self.speed_sum += other.speed_sum
+        self.speed_count += other.speed_count
+        self.volume_sum += other.volume_sum
+        self.volume_count += other.volume_count
+        self.rows += other.rows
+
+    @property
+    def avg_speed(self) -> float | None:
+        """
+        Returns the mean speed over intervals with valid speed data, returns None if there are none.
+        """
+        if not self.speed_count:
+            return None
+        return self.speed_sum / self.speed_count
+
+    def to_list(self) -> List[int]:
+        """
+        Returns the totals as a list for persisting.
+        """
+        return [
+            self.speed_sum,
+            self.speed_count,
+            self.volume_sum,
+            self.volume_count,
+            self.rows,
+        ]
+
+    @classmethod
+    def from_list(cls, values: List[int]) -> "RollupTotals":
+        """
+        Creates RollupTotals from a list produced by to_list.
+        """
+        totals = cls()
+        (
+            totals.speed_sum,
+            totals.speed_count,
+            totals.volume_sum,
+            totals.volume_count,
+            totals.rows,
+        ) = values
+        return totals
+
+
+class SiteRollups:
+    """
+    Hourly and daily rollups for a single site, updated as intervals arrive so that aggregate queries never rescan raw observations.
+    """
+
+    # required attributes
+    daily: Dict[date, RollupTotals]
+    hourly: Dict[Tuple[date, int], RollupTotals]
+
+    def __init__(self) -> None:
+        """
+        Creates empty SiteRollups with no intervals.
+        """
+        self.daily = {}
+        self.hourly = {}
+
+        # totals across every day, overall and for each hour of the day
+        self._total = RollupTotals()
+        self._hour_of_day = [RollupTotals() for _ in range(24)]
+
+        # bitmap of the 15 minute slots already added for each day
+        self._present: Dict[date, int] = {}
+
+    @classmethod
+    def from_observations(cls, observations: Iterable["Observation"]) -> "SiteRollups":
+        """
+        Creates SiteRollups from a list of observations.
+        """
+        rollups = cls()
+        for observation in observations:
+            rollups.add(observation)
+        return rollups
+
+    @classmethod
+    def from_columns(cls, columns: "ObservationColumns") -> "SiteRollups":
+        """
+        Creates SiteRollups from ObservationColumns without creating Observation objects.
+        """
+        rollups = cls()
+        rollups.add_columns(columns)
+        return rollups
+
+    def add(self, observation: "Observation") -> None:
+        """
+        Adds a single observation to the hourly, daily, and overall rollups.
+        """
+        # imported here as columns imports webtris_client, which imports this module
+        from columns import SLOT_SECONDS
+
+        period = observation.time_period_ending
+        seconds = period.hour * 3600 + period.minute * 60 + period.second
+        self._add_interval(
+            observation.report_date,
+            seconds,
+            seconds // SLOT_SECONDS,
+            observation.avg_speed,
+            observation.total_volume,
+        )
+
+    def add_columns(self, columns: "ObservationColumns") -> None:
+        """
+        Adds every interval stored in ObservationColumns to the rollups without creating Observation objects.
+        """
+        # imported here as columns imports webtris_client, which imports this module
+        from columns import MISSING, SLOT_SECONDS
+
+        report_date = None
+        previous_ordinal = None
+        for ordinal, seconds, avg_speed, total_volume in zip(
+            columns.report_dates,
+            columns.times,
+            columns.avg_speeds,
+            columns.total_volumes,
+        ):
+            if ordinal != previous_ordinal:
+                report_date = date.fromordinal(ordinal)
+                previous_ordinal = ordinal
+            self._add_interval(
+                report_date,
+                seconds,
+                seconds // SLOT_SECONDS,
+                None if avg_speed == MISSING else avg_speed,
+                None if total_volume == MISSING else total_volume,
+            )
+
+    def is_new(self, observation: "Observation") -> bool:
+        """
+        Returns True if no interval has been added yet for the observation's 15 minute slot of its day, so late intervals that fill a gap are still new.
+        """
+        from columns import SLOT_SECONDS
+
+        period = observation.time_period_ending
+        slot = (period.hour * 3600 + period.minute * 60 + period.second) // SLOT_SECONDS
+        return not self._present.get(observation.report_date, 0) >> slot & 1
+
+    def avg_speed(self, report_date: date | None = None) -> float | None:
+        """
+        Returns the average speed for a day, or across all days if no date is given, returns None if no valid data exists.
+        """
+        return self._totals_for(report_date).avg_speed
+
+    def total_volume(self, report_date: date | None = None) -> int:
+        """
+        Returns the total vehicle volume for a day, or across all days if no date is given.
+        """
+        return self._totals_for(report_date).volume_sum
+
+    def rows(self, report_date: date | None = None) -> int:
+        """
+        Returns the number of intervals added for a day, or across all days if no date is given.
+        """
+        return self._totals_for(report_date).rows
+
+    def avg_speed_for_hour(
+        self, hour: int, report_date: date | None = None
+    ) -> float | None:
+        """
+        Returns the average speed for an hour of a day, or of every day if no date is given, raises a ValueError for invalid hour input.
+        """
+        return self._totals_for_hour(hour, report_date).avg_speed
+
+    def total_volume_for_hour(self, hour: int, report_date: date | None = None) -> int:
+        """
+        Returns the total vehicle volume for an hour of a day, or of every day if no date is given, raises a ValueError for invalid hour input.
+        """
+        return self._totals_for_hour(hour, report_date).volume_sum
+
+    def peak_hour(self, report_date: date | None = None) -> int | None:
+        """
+        Returns the hour with the highest total vehicle volume, returns None if there is no traffic, ties go to the earliest hour.
+        """
+        peak_hour = None
+        peak_volume = 0
+        for hour in range(24):
+            volume = self.total_volume_for_hour(hour, report_date)
+            if volume > peak_volume:
+                peak_hour = hour
+                peak_volume = volume
+        return peak_hour
+
+    def save(self, path: str) -> None:
+        """
+        Persists the hourly and daily rollups to a JSON file.
+        """
+        data = {
+            "daily": {
+                report_date.isoformat(): totals.to_list()
+                for report_date, totals in self.daily.items()
+            },
+            "hourly": [
+                [report_date.isoformat(), hour, totals.to_list()]
+                for (report_date, hour), totals in self.hourly.items()
+            ],
+            "present": {
+                report_date.isoformat(): slots
+                for report_date, slots in self._present.items()
+            },
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "SiteRollups":
+        """
+        Loads rollups from a JSON file written by save.
+        """
+        with open(path) as file:
+            data = json.load(file)
+
+        rollups = cls()
+        for date_str, values in data["daily"].items():
+            totals = RollupTotals.from_list(values)
+            rollups.daily[date.fromisoformat(date_str)] = totals
+            rollups._total.merge(totals)
+        for date_str, hour, values in data["hourly"]:
+            totals = RollupTotals.from_list(values)
+            rollups.hourly[(date.fromisoformat(date_str), hour)] = totals
+            rollups._hour_of_day[hour].merge(totals)
+        for date_str, slots in data["present"].items():
+            rollups._present[date.fromisoformat(date_str)] = slots
+
+        return rollups
+
+    def _add_interval(
+        self,
+        report_date: date,
+        seconds: int,
+        slot: int,
+        avg_speed: int | None,
+        total_volume: int | None,
+    ) -> None:
+        """
+        Adds one interval ending at seconds since midnight, in the given 15 minute slot of its day, to every rollup table it belongs to.
+        """
+        hour = seconds // 3600
+
+        daily = self.daily.get(report_date)
+        if daily is None:
+            daily = self.daily[report_date] = RollupTotals()
+        hourly = self.hourly.get((report_date, hour))
+        if hourly is None:
+            hourly = self.hourly[(report_date, hour)] = RollupTotals()
+
+        for totals in (daily, hourly, self._total, self._hour_of_day[hour]):
+            totals.add(avg_speed, total_volume)
+
+        self._present[report_date] = self._present.get(report_date, 0) | 1 << slot
+
+    def _totals_for(self, report_date: date | None) -> RollupTotals:
+        """
+        Returns the totals for a day, or the overall totals if no date is given.
+        """
+        if report_date is None:
+            return self._total
+        return self.daily.get(report_date, RollupTotals())
+
+    def _totals_for_hour(self, hour: int, report_date: date | None) -> RollupTotals:
+        """
+        Returns the totals for an hour of a day, or of every day if no date is given.
+        """
+        # catch invalid hour input
+        if not (0 <= hour <= 23):
+            raise ValueError(f"Hour must be between 0 and 23, got {hour}")
+
+        if report_date is None:
+            return self._hour_of_day[hour]
+        return self.hourly.get((report_date, hour), RollupTotals())
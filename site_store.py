@@ -0,0 +1,289 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date, time
+from typing import Dict, List, Tuple
+
+from codec import decode_site_day, encode_site_day
+from columns import ObservationColumns
+from webtris_client import Observation
+
+# key used for every stored day of observations
+SiteDayKey = Tuple[int, date]
+
+# first byte of each spilled day, saying whether it uses the codec or compressed JSON
+_CODEC_BLOB = b"c"
+_JSON_BLOB = b"j"
+
+# the spill file is compacted once it holds at least this many bytes of replaced or discarded days
+COMPACT_MIN_DEAD_BYTES = 64 * 1024
+
+
+class SiteStore:
+    """
+    Keeps recently used site-days of observations in memory under a byte budget, spilling the least recently used days to a compressed file on disk.
+    """
+
+    # required attributes
+    max_bytes: int
+    spill_path: str
+
+    def __init__(
+        self, max_bytes: int = 64 * 1024 * 1024, spill_path: str | None = None
+    ) -> None:
+        """
+        Creates a SiteStore with a memory budget in bytes and an optional spill file path, a temporary file is used if no path is given.
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"Memory budget must be positive, got {max_bytes}")
+
+        self.max_bytes = max_bytes
+        self._owns_spill_file = spill_path is None
+        if spill_path is None:
+            handle, spill_path = tempfile.mkstemp(
+                prefix="webtris_spill_", suffix=".bin"
+            )
+            os.close(handle)
+        self.spill_path = spill_path
+        self._spill_file = open(spill_path, "w+b")
+
+        # resident days in least to most recently used order, with their estimated sizes
+        self._memory: "OrderedDict[SiteDayKey, List[Observation]]" = OrderedDict()
+        self._sizes: Dict[SiteDayKey, int] = {}
+        self._memory_bytes = 0
+
+        # offset and length of each day with a current copy in the spill file, including
+        # reloaded days, so evicting an unchanged day again does not rewrite it
+        self._spilled: Dict[SiteDayKey, Tuple[int, int]] = {}
+        self._live_bytes = 0
+        self._dead_bytes = 0
+
+        # every read also reorders the LRU and may seek the spill file, so all access is locked
+        self._lock = threading.RLock()
+
+    @property
+    def spill_bytes(self) -> Tuple[int, int]:
+        """
+        Returns the number of bytes in the spill file holding current days, and the number holding replaced or discarded days not yet compacted.
+        """
+        return self._live_bytes, self._dead_bytes
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Returns the estimated number of bytes used by the days currently held in memory.
+        """
+        return self._memory_bytes
+
+    def put(
+        self, site_id: int, report_date: date, observations: List[Observation]
+    ) -> None:
+        """
+        Stores the observations for a site-day, replacing any existing data, and evicts cold days if the memory budget is exceeded.
+        """
+        key = (site_id, report_date)
+        size = self._estimate_bytes(observations)
+
+        with self._lock:
+            self.discard(site_id, report_date)
+            self._memory[key] = observations
+            self._sizes[key] = size
+            self._memory_bytes += size
+            self._evict()
+
+    def get(self, site_id: int, report_date: date) -> List[Observation]:
+        """
+        Returns the observations for a site-day, reloading them from the spill file if they were evicted, raises a KeyError if the day is unknown, the list must not be changed in place.
+        """
+        key = (site_id, report_date)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)  # mark as most recently used
+                return self._memory[key]
+
+            if key not in self._spilled:
+                raise KeyError(f"No data stored for site {site_id} on {report_date}")
+
+            observations = self._read_spilled(key)
+            self._memory[key] = observations
+            self._sizes[key] = self._estimate_bytes(observations)
+            self._memory_bytes += self._sizes[key]
+            self._evict()
+
+            return observations
+
+    def discard(self, site_id: int, report_date: date) -> None:
+        """
+        Removes a site-day from the store if it exists, whether it is in memory or spilled.
+        """
+        key = (site_id, report_date)
+        with self._lock:
+            if key in self._memory:
+                del self._memory[key]
+                self._memory_bytes -= self._sizes.pop(key)
+            if key in self._spilled:
+                _, length = self._spilled.pop(key)
+                self._live_bytes -= length
+                self._dead_bytes += length
+                self._compact_if_needed()
+
+    def keys(self) -> List[SiteDayKey]:
+        """
+        Returns the (site_id, report_date) keys of every stored site-day, in memory or on disk, without loading any of them.
+        """
+        with self._lock:
+            return list(self._memory) + [
+                key for key in self._spilled if key not in self._memory
+            ]
+
+    def is_resident(self, site_id: int, report_date: date) -> bool:
+        """
+        Returns True if the site-day is currently held in memory rather than in the spill file.
+        """
+        with self._lock:
+            return (site_id, report_date) in self._memory
+
+    def close(self) -> None:
+        """
+        Closes the spill file, deleting it if it was created by this store.
+        """
+        with self._lock:
+            if self._spill_file.closed:
+                return
+            self._spill_file.close()
+        if self._owns_spill_file:
+            os.remove(self.spill_path)
+
+    def _evict(self) -> None:
+        """
+        Spills least recently used days to disk until memory use is within budget, always keeping the most recently used day.
+        """
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            key, observations = self._memory.popitem(last=False)
+            self._memory_bytes -= self._sizes.pop(key)
+            if key not in self._spilled:  # unchanged since it was reloaded
+                self._spilled[key] = self._write_spilled(observations)
+                self._live_bytes += self._spilled[key][1]
+
+    def _compact_if_needed(self) -> None:
+        """
+        Rewrites the spill file with only the current days once replaced and discarded days take up more of it than current ones.
+        """
+        if (
+            self._dead_bytes < COMPACT_MIN_DEAD_BYTES
+            or self._dead_bytes < self._live_bytes
+        ):
+            return
+
+        compact_path = f"{self.spill_path}.compact"
+        spilled = {}
+        with open(compact_path, "wb") as compact_file:
+            for key, (offset, length) in self._spilled.items():
+                self._spill_file.seek(offset)
+                spilled[key] = (compact_file.tell(), length)
+                compact_file.write(self._spill_file.read(length))
+
+        self._spill_file.close()
+        os.replace(compact_path, self.spill_path)
+        self._spill_file = open(self.spill_path, "r+b")
+        self._spilled = spilled
+        self._dead_bytes = 0
+
+    def _write_spilled(self, observations: List[Observation]) -> Tuple[int, int]:
+        """
+        Appends a compressed day of observations to the spill file and returns its offset and length, using the delta bit-packed codec when the day is on the 15 minute grid.
+        """
+        try:
+            blob = _CODEC_BLOB + encode_site_day(
+                ObservationColumns.from_observations(observations)
+            )
+        except ValueError:
+            blob = _JSON_BLOB + self._compress_json(observations)
+
+        self._spill_file.seek(0, os.SEEK_END)
+        offset = self._spill_file.tell()
+        self._spill_file.write(blob)
+        return offset, len(blob)
+
+    def _compress_json(self, observations: List[Observation]) -> bytes:
+        """
+        Compresses a day of observations as JSON, for days the codec cannot encode exactly.
+        """
+        # only the site name and per-interval values are written, the date is part of the key
+        payload = {
+            "site_name": observations[0].site_name if observations else "",
+            "rows": [
+                [
+                    observation.time_period_ending.hour * 3600
+                    + observation.time_period_ending.minute * 60
+                    + observation.time_period_ending.second,
+                    observation.avg_speed,
+                    observation.total_volume,
+                ]
+                for observation in observations
+            ],
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def _read_spilled(self, key: SiteDayKey) -> List[Observation]:
+        """
+        Reads and decodes a day of observations from the spill file.
+        """
+        offset, length = self._spilled[key]
+        self._spill_file.seek(offset)
+        blob = self._spill_file.read(length)
+
+        if blob[:1] == _CODEC_BLOB:
+            return decode_site_day(blob[1:]).to_observations()
+
+        payload = json.loads(zlib.decompress(blob[1:]))
+
+        return [
+            Observation(
+                site_name=payload["site_name"],
+                report_date=key[1],
+                time_period_ending=time(
+                    hour=seconds // 3600,
+                    minute=seconds % 3600 // 60,
+                    second=seconds % 60,
+                ),
+                avg_speed=avg_speed,
+                total_volume=total_volume,
+            )
+            for seconds, avg_speed, total_volume in payload["rows"]
+        ]
+
+    def _estimate_bytes(self, observations: List[Observation]) -> int:
+        """
+        Estimates the memory used by a list of observations, including each observation's attributes.
+        """
+        total = sys.getsizeof(observations)
+        for observation in observations:
+            total += sys.getsizeof(observation) + sys.getsizeof(observation.__dict__)
+            total += sys.getsizeof(observation.report_date)
+            total += sys.getsizeof(observation.time_period_ending)
+            total += sys.getsizeof(observation.avg_speed) + sys.getsizeof(
+                observation.total_volume
+            )
+        return total
+
+    def __contains__(self, key: SiteDayKey) -> bool:
+        """
+        Returns True if the (site_id, report_date) key is stored in memory or on disk.
+        """
+        with self._lock:
+            return key in self._memory or key in self._spilled
+
+    def __len__(self) -> int:
+        """
+        Returns the total number of site-days stored in memory or on disk.
+        """
+        with self._lock:
+            return len(self._memory) + sum(
+                key not in self._memory for key in self._spilled
+            )
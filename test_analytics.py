@@ -0,0 +1,89 @@
+from datetime import date
+import pytest
+
+np = pytest.importorskip("numpy")
+from analytics import (  # noqa: E402
+    align_sites,
+    correlation_matrix,
+    distance_matrix,
+    lag_matrix,
+)
+
+
+# fixture for a random grid of sites with gaps
+@pytest.fixture
+def random_grid():
+
+    rng = np.random.default_rng(0)
+    grid = rng.normal(100, 20, size=(7, 96))
+    grid[rng.random(grid.shape) < 0.1] = np.nan
+    return grid
+
+
+# test cases for cross-site analytics (functions titles are self explanatory)
+class TestAnalytics:
+    def test_align_sites(self, make_columns):
+
+        volumes = list(range(96))
+        volumes[5] = None
+        grid = align_sites(
+            [
+                make_columns(
+                    [(slot, 60, volume) for slot, volume in enumerate(volumes)]
+                ),
+                make_columns([], date(2024, 1, 2)),
+            ],
+            start=date(2024, 1, 1),
+            end=date(2024, 1, 2),
+        )
+
+        assert grid.shape == (2, 192)
+        assert grid[0, 10] == 10
+        assert np.isnan(grid[0, 5])
+        assert np.isnan(grid[0, 96:]).all()
+        assert np.isnan(grid[1]).all()
+
+    def test_align_sites_invalid_input(self):
+
+        with pytest.raises(ValueError, match="Field must be one of"):
+            align_sites([], date(2024, 1, 1), date(2024, 1, 1), field="speed")
+        with pytest.raises(ValueError, match="is before start date"):
+            align_sites([], date(2024, 1, 2), date(2024, 1, 1))
+
+    def test_correlation_matches_pairwise(self, random_grid):
+
+        result = correlation_matrix(random_grid, chunk_size=3)
+
+        for i in range(len(random_grid)):
+            for j in range(len(random_grid)):
+                both = ~np.isnan(random_grid[i]) & ~np.isnan(random_grid[j])
+                expected = np.corrcoef(random_grid[i][both], random_grid[j][both])[0, 1]
+                assert result[i, j] == pytest.approx(expected)
+
+    def test_correlation_constant_site(self):
+
+        grid = np.array([[1.0, 1.0, 1.0], [1.0, 2.0, 3.0]])
+
+        assert np.isnan(correlation_matrix(grid)[0, 1])
+        assert correlation_matrix(grid)[1, 1] == pytest.approx(1)
+
+    def test_distance_matches_pairwise(self, random_grid):
+
+        result = distance_matrix(random_grid, chunk_size=4)
+
+        both = ~np.isnan(random_grid[1]) & ~np.isnan(random_grid[5])
+        difference = random_grid[1][both] - random_grid[5][both]
+        assert result[1, 5] == pytest.approx(np.sqrt(np.mean(difference**2)))
+        assert np.diag(result) == pytest.approx(np.zeros(len(random_grid)))
+
+    def test_lag_matrix_finds_shift(self):
+
+        rng = np.random.default_rng(1)
+        signal = rng.normal(size=200)
+        grid = np.vstack([signal[3:99], signal[0:96]])  # second site follows by 3
+
+        lags, correlations = lag_matrix(grid, max_lag=5)
+
+        assert lags[0, 1] == 3
+        assert lags[1, 0] == -3
+        assert correlations[0, 1] == pytest.approx(1)
@@ -0,0 +1,194 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+import pytest
+from archive import ArchiveConnector
+from query import ArchiveSource, Query
+from webtris_client import APIClient, APIConnectionError
+
+# raw API response body with a single observation
+RAW_RESPONSE = json.dumps(
+    {
+        "Rows": [
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2024-01-01T00:00:00",
+                "Time Period Ending": "08:14:00",
+                "Avg mph": "60",
+                "Total Volume": "100",
+            }
+        ]
+    }
+).encode("utf-8")
+
+
+# raw API response body with a full day of observations, including missing data
+FULL_DAY_RESPONSE = json.dumps(
+    {
+        "Rows": [
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2024-01-01T00:00:00",
+                "Time Period Ending": f"{slot // 4:02d}:{slot % 4 * 15 + 14:02d}:00",
+                "Avg mph": "" if slot == 5 else str(60 - slot % 5),
+                "Total Volume": "" if slot == 9 else str(100 + slot),
+            }
+            for slot in range(96)
+        ]
+    }
+).encode("utf-8")
+
+
+# test cases for ArchiveConnector and offline mode (functions titles are self explanatory)
+class TestArchiveConnector:
+    def test_fallback_fills_archive(self, tmp_path):
+
+        fallback = Mock()
+        fallback.make_raw_request.return_value = RAW_RESPONSE
+        client = APIClient(connector=ArchiveConnector(str(tmp_path), fallback))
+
+        client.get_daily_data(461, "01012024")
+        client.get_daily_data(461, "01012024")
+
+        assert fallback.make_raw_request.call_count == 1
+        assert sorted(os.listdir(tmp_path)) == [
+            "461_01012024_01012024_1_500.json.gz",
+            "461_01012024_01012024_1_500.rollups.json",
+        ]
+
+    def test_rollups_saved_with_response(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        archive = ArchiveConnector(str(tmp_path))
+        archive.save(url, RAW_RESPONSE)
+
+        rollups = archive.load_rollups(url)
+
+        assert rollups.total_volume() == 100
+        assert rollups.peak_hour() == 8
+        assert archive.load_rollups(url.replace("461", "462")) is None
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_concurrent_saves_of_one_url(self, tmp_path, compact):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        archive = ArchiveConnector(str(tmp_path), compact=compact)
+        barrier = threading.Barrier(8)
+
+        def save():
+            barrier.wait()
+            for _ in range(20):
+                archive.save(url, FULL_DAY_RESPONSE)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(save) for _ in range(8)]
+        for future in futures:
+            future.result()
+
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+        assert len(archive.make_request(url)["Rows"]) == 96
+        assert archive.load_rollups(url).rows() == 96
+
+    def test_offline_client_reads_archive(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        ArchiveConnector(str(tmp_path)).save(url, RAW_RESPONSE)
+
+        observations = APIClient.offline(str(tmp_path)).get_daily_data(461, "01012024")
+
+        assert len(observations) == 1
+        assert observations[0].total_volume == 100
+
+    def test_offline_missing_response(self, tmp_path):
+
+        client = APIClient.offline(str(tmp_path))
+
+        with pytest.raises(APIConnectionError, match="Offline mode"):
+            client.get_daily_data(461, "01012024")
+
+    def test_offline_mode_does_not_import_requests(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        ArchiveConnector(str(tmp_path)).save(url, RAW_RESPONSE)
+        code = (
+            "import sys, webtris_client\n"
+            f"site = webtris_client.SingleSite(461, '')\n"
+            f"site.get_data(webtris_client.APIClient.offline({str(tmp_path)!r}), '01012024')\n"
+            "print(site.calculate_total_volume(), 'requests' in sys.modules)\n"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        assert output.split() == ["100", "False"]
+
+
+# test cases for compact archives stored with the codec (functions titles are self explanatory)
+class TestCompactArchive:
+    def test_compact_round_trip(self, tmp_path):
+
+        client = APIClient(connector=Mock())
+        url = client.make_url(461, "01012024", "01012024")
+        ArchiveConnector(str(tmp_path), compact=True).save(url, FULL_DAY_RESPONSE)
+
+        observations = APIClient.offline(str(tmp_path)).get_daily_data(461, "01012024")
+        expected = client.parse_json_response(json.loads(FULL_DAY_RESPONSE))
+
+        assert sorted(os.listdir(tmp_path)) == [
+            "461_01012024_01012024_1_500.day",
+            "461_01012024_01012024_1_500.rollups.json",
+        ]
+        assert [repr(observation) for observation in observations] == [
+            repr(observation) for observation in expected
+        ]
+
+    def test_compact_smaller_than_gzipped_json(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        archive = ArchiveConnector(str(tmp_path), compact=True)
+        archive.save(url, FULL_DAY_RESPONSE)
+
+        size = os.path.getsize(archive.compact_path(url))
+        assert size < len(gzip.compress(FULL_DAY_RESPONSE)) / 4
+
+    def test_off_grid_response_kept_as_json(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        archive = ArchiveConnector(str(tmp_path), compact=True)
+        archive.save(url, RAW_RESPONSE.replace(b"08:14:00", b"08:10:00"))
+
+        assert os.path.exists(archive.file_path(url))
+        assert archive.load_columns(url) is None
+        assert archive.make_request(url)["Rows"][0]["Time Period Ending"] == "08:10:00"
+
+    def test_resaving_replaces_other_form(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        ArchiveConnector(str(tmp_path), compact=True).save(url, FULL_DAY_RESPONSE)
+        ArchiveConnector(str(tmp_path)).save(url, RAW_RESPONSE)
+
+        assert len(ArchiveConnector(str(tmp_path)).make_request(url)["Rows"]) == 1
+
+    def test_query_reads_compact_files(self, tmp_path):
+
+        url = APIClient(connector=Mock()).make_url(461, "01012024", "01012024")
+        ArchiveConnector(str(tmp_path), compact=True).save(url, FULL_DAY_RESPONSE)
+
+        rows = (
+            Query(ArchiveSource(str(tmp_path)))
+            .group_by("site")
+            .aggregate("total_volume", "count")
+            .run()
+        )
+
+        assert rows == [{"site_id": 461, "total_volume_count": 95}]
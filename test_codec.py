@@ -0,0 +1,112 @@
+import json
+from datetime import date
+import pytest
+from codec import (
+    decode_day,
+    decode_series,
+    decode_site_day,
+    encode_day,
+    encode_site_day,
+)
+from columns import MISSING
+
+
+# fixture for a full day of smoothly varying speeds and volumes
+@pytest.fixture
+def full_day(make_columns):
+
+    return make_columns(
+        [(slot, 60 - slot % 7, 100 + slot * 3 % 40) for slot in range(96)]
+    )
+
+
+# test cases for the codec functions (functions titles are self explanatory)
+class TestCodec:
+    def test_round_trip(self, full_day):
+
+        decoded = decode_day(encode_day(full_day), "Example Site", date(2024, 1, 1))
+
+        assert decoded.site_name == "Example Site"
+        assert list(decoded.report_dates) == list(full_day.report_dates)
+        assert list(decoded.times) == list(full_day.times)
+        assert list(decoded.avg_speeds) == list(full_day.avg_speeds)
+        assert list(decoded.total_volumes) == list(full_day.total_volumes)
+
+    def test_round_trip_with_missing_values_and_gaps(self, make_columns):
+
+        columns = make_columns(
+            [(0, 70, MISSING), (1, MISSING, 150), (2, MISSING, MISSING), (50, 0, 0)]
+        )
+
+        decoded = decode_day(encode_day(columns), "Example Site", date(2024, 1, 1))
+
+        assert list(decoded.times) == list(columns.times)
+        assert list(decoded.avg_speeds) == [70, MISSING, MISSING, 0]
+        assert list(decoded.total_volumes) == [MISSING, 150, MISSING, 0]
+
+    def test_site_day_round_trip(self, full_day):
+
+        decoded = decode_site_day(encode_site_day(full_day))
+
+        assert decoded.site_name == "Example Site"
+        assert list(decoded.report_dates) == list(full_day.report_dates)
+        assert list(decoded.total_volumes) == list(full_day.total_volumes)
+
+    def test_decode_series(self, make_columns):
+
+        columns = make_columns([(1, 65, 120), (3, 40, MISSING)])
+
+        speeds, volumes = decode_series(encode_day(columns))
+
+        assert len(speeds) == len(volumes) == 96
+        assert list(speeds[:4]) == [MISSING, 65, MISSING, 40]
+        assert list(volumes[:4]) == [MISSING, 120, MISSING, MISSING]
+        assert set(speeds[4:]) == {MISSING}
+
+    def test_empty_day(self, make_columns):
+
+        decoded = decode_day(
+            encode_day(make_columns([])), "Example Site", date(2024, 1, 1)
+        )
+
+        assert len(decoded) == 0
+
+    def test_much_smaller_than_json(self, full_day):
+
+        encoded = encode_day(full_day)
+        as_json = json.dumps(
+            [
+                list(row)
+                for row in zip(
+                    full_day.times, full_day.avg_speeds, full_day.total_volumes
+                )
+            ]
+        )
+
+        assert len(encoded) < len(as_json) / 5
+
+    def test_off_grid_time(self, make_columns):
+
+        columns = make_columns([(0, 60, 100)])
+        columns.times[0] = 600
+
+        with pytest.raises(ValueError, match="not on the 15 minute grid"):
+            encode_day(columns)
+
+    def test_unsorted_rows(self, make_columns):
+
+        with pytest.raises(ValueError, match="slot order"):
+            encode_day(make_columns([(5, 60, 100), (4, 60, 100)]))
+
+    def test_multiple_dates(self, make_columns):
+
+        columns = make_columns([(0, 60, 100), (1, 60, 100)])
+        columns.report_dates[1] += 1
+
+        with pytest.raises(ValueError, match="single date"):
+            encode_day(columns)
+
+    def test_unknown_format(self):
+
+        with pytest.raises(ValueError, match="Unknown encoded day format"):
+            decode_series(b"\x09")
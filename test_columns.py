@@ -0,0 +1,112 @@
+from datetime import date, time
+import pytest
+from columns import MISSING, ObservationColumns
+from webtris_client import APIClient, APIResponseError, Observation
+from unittest.mock import Mock
+
+
+# fixture for an API response with rows out of order and missing data
+@pytest.fixture
+def api_response():
+
+    return {
+        "Header": {"row_count": 3, "start_date": "19102025", "end_date": "19102025"},
+        "Rows": [
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2025-10-19T00:00:00",
+                "Time Period Ending": "00:44:00",
+                "Avg mph": "68",
+                "Total Volume": "",  # empty volume
+            },
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2025-10-19T00:00:00",
+                "Time Period Ending": "00:14:00",
+                "Avg mph": "",  # empty speed
+                "Total Volume": "182",
+            },
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2025-10-18T00:00:00",
+                "Time Period Ending": "23:59:00",
+                "Avg mph": "70",
+                "Total Volume": "150",
+            },
+        ],
+    }
+
+
+# test cases for ObservationColumns class (functions titles are self explanatory)
+class TestObservationColumns:
+    def test_from_json_response(self, api_response):
+
+        columns = ObservationColumns.from_json_response(api_response)
+
+        assert len(columns) == 3
+        assert columns.site_name == "Example Site"
+        assert list(columns.report_dates) == [date(2025, 10, 19).toordinal()] * 2 + [
+            date(2025, 10, 18).toordinal()
+        ]
+        assert list(columns.times) == [44 * 60, 14 * 60, 23 * 3600 + 59 * 60]
+        assert list(columns.avg_speeds) == [68, MISSING, 70]
+        assert list(columns.total_volumes) == [MISSING, 182, 150]
+
+    def test_matches_parse_json_response(self, api_response):
+
+        client = APIClient(connector=Mock())
+        expected = client.parse_json_response(api_response)
+        observations = ObservationColumns.from_json_response(
+            api_response
+        ).to_observations()
+
+        assert [repr(observation) for observation in observations] == [
+            repr(observation) for observation in expected
+        ]
+
+    def test_invalid_api_response(self):
+
+        with pytest.raises(APIResponseError):
+            ObservationColumns.from_json_response({"Header": {}})
+
+    def test_sort(self, api_response):
+
+        columns = ObservationColumns.from_json_response(api_response)
+        columns.sort()
+
+        assert list(columns.times) == [23 * 3600 + 59 * 60, 14 * 60, 44 * 60]
+        assert list(columns.avg_speeds) == [70, MISSING, 68]
+
+    def test_bytes_round_trip(self, api_response):
+
+        columns = ObservationColumns.from_json_response(api_response)
+        packed = columns.to_bytes()
+        unpacked = ObservationColumns.from_bytes(packed)
+
+        assert len(packed) == columns.packed_size()
+        assert unpacked.site_name == columns.site_name
+        assert unpacked.report_dates == columns.report_dates
+        assert unpacked.times == columns.times
+        assert unpacked.avg_speeds == columns.avg_speeds
+        assert unpacked.total_volumes == columns.total_volumes
+
+    def test_from_observations(self):
+
+        observations = [
+            Observation("Example Site", date(2025, 10, 19), time(0, 14), None, 10),
+            Observation("Example Site", date(2025, 10, 19), time(0, 29), 60, None),
+        ]
+        columns = ObservationColumns.from_observations(observations)
+
+        assert list(columns.avg_speeds) == [MISSING, 60]
+        assert list(columns.total_volumes) == [10, MISSING]
+        assert columns.to_observations() == observations
+
+    def test_mismatched_columns(self):
+
+        from array import array
+
+        with pytest.raises(ValueError, match="All columns must have the same length"):
+            ObservationColumns(
+                "Example Site", array("i", [1]), array("i"), array("i"), array("i")
+            )
@@ -0,0 +1,103 @@
+from datetime import date, datetime
+import pytest
+
+np = pytest.importorskip("numpy")
+from detection import (  # noqa: E402
+    CONGESTION,
+    DEAD_SENSOR,
+    Event,
+    EventDetector,
+    detect_events,
+)
+
+
+# fixture for a day of speed and volume grids for three sites with known events
+@pytest.fixture
+def grids():
+
+    speeds = np.full((3, 96), 60.0)
+    volumes = np.full((3, 96), 100.0)
+
+    # site 461 slows down with traffic held up, congestion from 10:00 to 11:00
+    speeds[0, 40:44] = 30
+    # site 462 slows down but traffic also drops, not congestion
+    speeds[1, 40:44] = 30
+    volumes[1, 40:44] = 10
+    # site 463 reports nothing from 15:00 to 17:30
+    speeds[2, 60:70] = np.nan
+    volumes[2, 60:70] = np.nan
+
+    return speeds, volumes
+
+
+# test cases for congestion and dead sensor detection (functions titles are self explanatory)
+class TestDetection:
+    def test_detect_events(self, grids):
+
+        events = detect_events([461, 462, 463], *grids, start=date(2024, 1, 1))
+
+        assert events == [
+            Event(
+                461, CONGESTION, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11), 0.5
+            ),
+            Event(
+                463,
+                DEAD_SENSOR,
+                datetime(2024, 1, 1, 15),
+                datetime(2024, 1, 1, 17, 30),
+                2.5,
+            ),
+        ]
+
+    def test_short_events_ignored(self, grids):
+
+        speeds, volumes = grids
+        speeds[1, 80] = 30  # a single slow slot
+
+        events = detect_events(
+            [461, 462, 463], speeds, volumes, date(2024, 1, 1), min_dead=11
+        )
+
+        assert [event.kind for event in events] == [CONGESTION]
+
+    def test_incremental_matches_batch(self, grids):
+
+        speeds, volumes = grids
+        detector = EventDetector([461, 462, 463], date(2024, 1, 1))
+
+        events = []
+        for start in range(0, 96, 7):
+            events += detector.append(
+                speeds[:, start : start + 7], volumes[:, start : start + 7]
+            )
+        events += detector.flush()
+
+        assert events == detect_events([461, 462, 463], *grids, date(2024, 1, 1))
+
+    def test_open_events(self, grids):
+
+        speeds, volumes = grids
+        detector = EventDetector([461, 462, 463], date(2024, 1, 1))
+
+        assert detector.append(speeds[:, :42], volumes[:, :42]) == []
+        assert detector.open_events() == [
+            Event(
+                461,
+                CONGESTION,
+                datetime(2024, 1, 1, 10),
+                datetime(2024, 1, 1, 10, 30),
+                0.5,
+                ongoing=True,
+            )
+        ]
+
+        closed = detector.append(speeds[:, 42:], volumes[:, 42:])
+        assert closed[0].end == datetime(2024, 1, 1, 11)
+        assert detector.open_events() == []
+
+    def test_invalid_input(self, grids):
+
+        with pytest.raises(ValueError, match="Window must be at least 1 slot"):
+            EventDetector([461], date(2024, 1, 1), window=0)
+        with pytest.raises(ValueError, match="must both have 2 rows"):
+            EventDetector([461, 462], date(2024, 1, 1)).append(*grids)
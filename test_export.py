@@ -0,0 +1,143 @@
+from datetime import date, time
+import pytest
+from export import export_sites
+from webtris_client import Observation, SingleSite
+
+np = pytest.importorskip("numpy")
+
+
+# fixture for a site with missing speed and volume data
+@pytest.fixture
+def site():
+
+    site = SingleSite(site_id=461, site_name="Example Site")
+    site.observations = [
+        Observation("Example Site", date(2024, 1, 1), time(0, 14), 65, 182),
+        Observation("Example Site", date(2024, 1, 1), time(0, 29), None, 150),
+        Observation("Example Site", date(2024, 1, 2), time(0, 14), 55, None),
+    ]
+    return site
+
+
+# fixture for a second site
+@pytest.fixture
+def other_site():
+
+    site = SingleSite(site_id=462, site_name="Other Site")
+    site.observations = [
+        Observation("Other Site", date(2024, 1, 1), time(0, 14), 40, 10),
+    ]
+    return site
+
+
+# test cases for exporting SingleSite data (functions titles are self explanatory)
+class TestExport:
+    def test_to_numpy(self, site):
+
+        arrays = site.to_numpy()
+
+        assert arrays["report_date"][2] == np.datetime64("2024-01-02")
+        assert arrays["time_period_ending"][1] == np.timedelta64(29 * 60, "s")
+        assert arrays["avg_speed"].mask.tolist() == [False, True, False]
+        assert arrays["total_volume"].sum() == 332
+
+    def test_to_numpy_shares_buffers(self, site):
+
+        arrays = site.to_numpy()
+
+        assert np.shares_memory(
+            arrays["avg_speed"].data,
+            np.frombuffer(site.to_columns().avg_speeds, np.intc),
+        )
+
+    def test_changing_an_export_cannot_change_the_site(self, site):
+
+        arrays = site.to_numpy()
+        with pytest.raises(ValueError, match="read-only"):
+            arrays["avg_speed"][0] = 999
+        with pytest.raises(ValueError, match="read-only"):
+            arrays["total_volume"].data[0] = 999
+
+        pytest.importorskip("pandas")
+        frame = site.to_pandas()
+        with pytest.raises(ValueError, match="read-only"):
+            frame.loc[0, "total_volume"] = 5
+
+        assert site.to_numpy()["avg_speed"][0] == 65
+        assert site.to_pandas().loc[0, "total_volume"] == 182
+        assert site.calculate_avg_speed() == 60
+        assert export_sites([site], format="pandas")["total_volume"].sum() == 332
+
+    def test_to_pandas(self, site):
+
+        pd = pytest.importorskip("pandas")
+        frame = site.to_pandas()
+
+        assert list(frame.columns) == [
+            "site_id",
+            "site_name",
+            "report_date",
+            "time_period_ending",
+            "avg_speed",
+            "total_volume",
+        ]
+        assert frame["avg_speed"].isna().tolist() == [False, True, False]
+        assert frame["total_volume"].sum() == 332
+        assert frame["report_date"].iloc[2] == pd.Timestamp("2024-01-02")
+        assert frame["time_period_ending"].iloc[0] == pd.Timedelta(minutes=14)
+
+    def test_to_arrow(self, site):
+
+        pytest.importorskip("pyarrow")
+        table = site.to_arrow()
+
+        assert table.num_rows == 3
+        assert table.column("avg_speed").null_count == 1
+        assert table.column("total_volume").to_pylist() == [182, 150, None]
+        assert table.column("report_date").to_pylist()[2] == date(2024, 1, 2)
+        assert table.column("time_period_ending").to_pylist()[1] == time(0, 29)
+        assert table.column("site_name").to_pylist() == ["Example Site"] * 3
+
+    def test_columns_rebuilt_after_append(self, site):
+
+        columns = site.to_columns()
+        site.append_observations(
+            [Observation("Example Site", date(2024, 1, 2), time(0, 29), 50, 5)]
+        )
+
+        assert site.to_columns() is not columns
+        assert len(site.to_columns()) == 4
+
+    @pytest.mark.parametrize("format", ["numpy", "pandas", "arrow"])
+    def test_export_sites(self, site, other_site, format):
+
+        pytest.importorskip(
+            {"numpy": "numpy", "pandas": "pandas", "arrow": "pyarrow"}[format]
+        )
+        result = export_sites([site, other_site], format=format)
+
+        if format == "arrow":
+            site_ids = result.column("site_id").to_pylist()
+            volumes = np.array(result.column("total_volume").to_pylist(), dtype=float)
+            volumes = volumes[~np.isnan(volumes)]
+        else:
+            site_ids = result["site_id"].tolist()
+            volumes = result["total_volume"]
+
+        assert site_ids == [461, 461, 461, 462]
+        assert volumes.sum() == 342
+
+    @pytest.mark.parametrize("format", ["numpy", "pandas", "arrow"])
+    def test_export_no_sites(self, format):
+
+        pytest.importorskip(
+            {"numpy": "numpy", "pandas": "pandas", "arrow": "pyarrow"}[format]
+        )
+        result = export_sites([], format=format)
+
+        assert len(result["site_id"]) == 0
+
+    def test_export_invalid_format(self, site):
+
+        with pytest.raises(ValueError, match="Format must be one of"):
+            export_sites([site], format="csv")
@@ -0,0 +1,169 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+from fetch import FetchResult, ThreadedFetcher, fetch_many
+from webtris_client import APIClient, APIConnector, APIResponseError, SingleSite
+
+
+# fixture for a client whose connector answers with two intervals per site-day, after a delay for site 1
+@pytest.fixture
+def client(make_response):
+
+    def delayed_response(url: str) -> dict:
+        if "sites=1&" in url:
+            time.sleep(0.2)
+        return make_response(url)
+
+    connector = Mock()
+    connector.make_request.side_effect = delayed_response
+    return APIClient(connector=connector)
+
+
+# dates for the first ten days of January 2024
+DATES = [f"{day:02d}012024" for day in range(1, 11)]
+
+
+# test cases for fetch_many and ThreadedFetcher (functions titles are self explanatory)
+class TestFetchMany:
+    def test_fetches_every_site_day(self, client):
+
+        results = list(fetch_many([2, 3], DATES[:2], workers=4, client=client))
+
+        assert sorted((result.site_id, result.date) for result in results) == [
+            (2, "01012024"),
+            (2, "02012024"),
+            (3, "01012024"),
+            (3, "02012024"),
+        ]
+        assert all(result.ok and len(result.result()) == 2 for result in results)
+
+    def test_results_in_completion_order(self, client):
+
+        results = list(fetch_many([1, 2], ["01012024"], workers=2, client=client))
+
+        assert [result.site_id for result in results] == [2, 1]
+
+    def test_errors_reported_per_item(self, client):
+
+        results = {
+            result.site_id: result
+            for result in fetch_many([2, 999], ["01012024"], workers=2, client=client)
+        }
+
+        assert results[2].ok
+        assert not results[999].ok
+        with pytest.raises(APIResponseError, match="404"):
+            results[999].result()
+
+    def test_invalid_date_reported_per_item(self, client):
+
+        results = list(fetch_many([2], ["01012024", "99999999"], client=client))
+
+        assert sorted(result.ok for result in results) == [False, True]
+
+    def test_cancel_stops_pending_fetches(self, client):
+
+        with ThreadedFetcher(client=client, workers=1) as fetcher:
+            results = []
+            for result in fetcher.fetch_many([1], DATES):
+                results.append(result)
+                fetcher.cancel()
+
+            assert fetcher.cancelled
+            assert len(results) == 1
+            assert list(fetcher.fetch_many([2], DATES)) == []
+        assert client.connector.make_request.call_count < len(DATES)
+
+    def test_only_one_fetch_per_worker_in_flight(self, client):
+
+        with ThreadedFetcher(client=client, workers=2) as fetcher:
+            fetcher._pool.submit = Mock(wraps=fetcher._pool.submit)
+            results = fetcher.fetch_many([2], DATES)
+            next(results)
+
+            assert fetcher._pool.submit.call_count == 2
+            assert len(list(results)) == len(DATES) - 1
+            assert fetcher._pool.submit.call_count == len(DATES)
+
+    def test_closing_generator_cancels_pending_fetches(self, client):
+
+        results = fetch_many([1], DATES, workers=1, client=client)
+        next(results)
+        results.close()
+
+        assert client.connector.make_request.call_count < len(DATES)
+
+    def test_updates_sites_with_safe_concurrent_reads(self, client):
+
+        site = SingleSite(site_id=2, site_name="")
+        totals = []
+        done = threading.Event()
+
+        # each day adds 200 vehicles at once, so a partial update would show up as another total
+        def read_totals():
+            while not done.is_set():
+                totals.append(site.calculate_total_volume())
+                site.find_peak_hour()
+
+        readers = [threading.Thread(target=read_totals) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        results = list(
+            fetch_many([2], DATES, workers=4, client=client, sites={2: site})
+        )
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        assert all(result.ok for result in results)
+        assert site.calculate_total_volume() == 200 * len(DATES)
+        assert len(site) == 2 * len(DATES)
+        assert site.site_name == "Example Site"
+        assert all(total % 200 == 0 for total in totals)
+
+    def test_invalid_workers(self, client):
+
+        with pytest.raises(ValueError, match="Workers must be at least 1"):
+            ThreadedFetcher(client=client, workers=0)
+
+    def test_result_repr(self):
+
+        assert repr(FetchResult(2, "01012024", observations=[])) == (
+            "FetchResult(site=2, date=01012024, observations=0)"
+        )
+
+
+# test cases for APIConnector connection pooling (functions titles are self explanatory)
+class TestPooledConnector:
+    def test_shares_one_session(self):
+
+        pytest.importorskip("requests")
+        connector = APIConnector(pool_size=4)
+        sessions = []
+        threads = [
+            threading.Thread(target=lambda: sessions.append(connector._get_session()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(session) for session in sessions}) == 1
+        assert sessions[0].get_adapter("https://example.com")._pool_maxsize == 4
+        connector.close()
+        assert connector._session is None
+
+    def test_requests_use_session(self):
+
+        pytest.importorskip("requests")
+        connector = APIConnector(pool_size=2)
+        response = Mock(status_code=200, content=b"{}", headers={})
+        with patch.object(
+            connector._get_session(), "get", return_value=response
+        ) as get:
+            connector.make_raw_request("https://example.com")
+
+        get.assert_called_once()
+        connector.close()
@@ -0,0 +1,177 @@
+import time
+from unittest.mock import Mock, patch
+import pytest
+import requests
+from fetch import fetch_many
+from hedging import HedgedConnector
+from response_cache import ResponseCache
+from webtris_client import APIClient, APIConnectionError, APIResponseError
+
+
+# fake requests.get that answers each call after the given delays, in call order
+def delayed_get(delays, status_code=200):
+    calls = iter(delays)
+
+    def get(url, **kwargs):
+        delay = next(calls)
+        time.sleep(delay)
+        return Mock(status_code=status_code, content=str(delay).encode(), headers={})
+
+    return get
+
+
+# fixture for a connector that hedges after two samples with no budget limit
+@pytest.fixture
+def connector():
+
+    hedged = HedgedConnector(percentile=50, budget=1, min_samples=2)
+    yield hedged
+    hedged.close()
+
+
+# test cases for HedgedConnector class (functions titles are self explanatory)
+class TestHedgedConnector:
+    def test_no_hedge_until_enough_samples(self, connector):
+
+        with patch("webtris_client.requests.get", delayed_get([0.05])):
+            connector.get_response("url")
+
+        assert connector.hedge_delay() is None
+        assert connector.hedge_stats.hedges == 0
+
+    def test_slow_request_is_hedged(self, connector):
+
+        with patch("webtris_client.requests.get", delayed_get([0.01, 0.01, 1, 0.01])):
+            connector.get_response("url")
+            connector.get_response("url")
+            start = time.perf_counter()
+            response = connector.get_response("url")
+
+        assert time.perf_counter() - start < 0.5
+        assert response.content == b"0.01"
+        assert connector.hedge_stats.hedges == 1
+        assert connector.hedge_stats.hedge_wins == 1
+        assert connector.hedge_stats.win_rate == 1
+
+    def test_budget_limits_hedges(self):
+
+        connector = HedgedConnector(percentile=50, budget=0.1, min_samples=2)
+        with patch("webtris_client.requests.get", delayed_get([0.01, 0.01, 0.2])):
+            for _ in range(3):
+                connector.get_response("url")
+        connector.close()
+
+        assert connector.hedge_stats.requests == 3
+        assert connector.hedge_stats.hedges == 0
+        assert connector.hedge_stats.win_rate is None
+
+    def test_connection_error_waits_for_other_request(self, connector):
+
+        # two quick samples, then a primary that fails slowly while the hedge succeeds
+        calls = iter(["fast", "fast", "slow_fail", "fast"])
+
+        def staged_get(url, **kwargs):
+            stage = next(calls)
+            if stage == "slow_fail":
+                time.sleep(0.2)
+                raise requests.exceptions.ConnectionError()
+            time.sleep(0.01)
+            return Mock(status_code=200, content=b"{}", headers={})
+
+        with patch("webtris_client.requests.get", staged_get):
+            connector.get_response("url")
+            connector.get_response("url")
+            response = connector.get_response("url")
+
+        assert response.content == b"{}"
+        assert connector.hedge_stats.hedge_wins == 1
+
+    def test_both_requests_fail(self, connector):
+
+        calls = iter(["fast", "fast", "fail", "fail"])
+
+        def staged_get(url, **kwargs):
+            stage = next(calls)
+            time.sleep(0.01 if stage == "fast" else 0.1)
+            if stage == "fail":
+                raise requests.exceptions.ConnectionError()
+            return Mock(status_code=200, content=b"{}", headers={})
+
+        with patch("webtris_client.requests.get", staged_get):
+            connector.get_response("url")
+            connector.get_response("url")
+            with pytest.raises(APIConnectionError):
+                connector.get_response("url")
+
+    def test_error_status_is_not_retried(self, connector):
+
+        with patch("webtris_client.requests.get", delayed_get([0], status_code=404)):
+            with pytest.raises(APIResponseError, match="Site not found"):
+                connector.get_response("url")
+
+    def test_invalid_settings(self):
+
+        with pytest.raises(ValueError, match="Percentile must be between 0 and 100"):
+            HedgedConnector(percentile=100)
+        with pytest.raises(ValueError, match="Budget must be between 0 and 1"):
+            HedgedConnector(budget=2)
+
+    def test_options_passed_to_api_connector(self):
+
+        cache = ResponseCache()
+        connector = HedgedConnector(timeout=5, cache=cache, pool_size=4)
+
+        assert connector.timeout == 5
+        assert connector.cache is cache
+        assert connector.pool_size == 4
+        connector.close()
+
+    def test_fetch_many_over_pooled_hedged_connector(self):
+
+        connector = HedgedConnector(pool_size=4, percentile=50, min_samples=2)
+        sessions = set()
+
+        def session_get(session, url, **kwargs):
+            sessions.add(id(session))
+            return Mock(status_code=200, content=b'{"Rows": []}', headers={})
+
+        with patch("requests.Session.get", session_get):
+            results = list(
+                fetch_many(
+                    [461, 462],
+                    ["01012024", "02012024"],
+                    workers=4,
+                    client=APIClient(connector=connector),
+                )
+            )
+
+        assert [result.ok for result in results] == [True] * 4
+        assert connector.hedge_stats.requests == 4
+        assert len(sessions) == 1
+        connector.close()
+
+    def test_fan_out_beyond_default_pool(self):
+
+        connector = HedgedConnector(pool_size=64, budget=0, min_samples=1)
+
+        def session_get(session, url, **kwargs):
+            time.sleep(0.3)
+            return Mock(status_code=200, content=b'{"Rows": []}', headers={})
+
+        with patch("requests.Session.get", session_get):
+            connector.get_response("url")
+            start = time.perf_counter()
+            results = list(
+                fetch_many(
+                    range(64),
+                    ["01012024"],
+                    workers=64,
+                    client=APIClient(connector=connector),
+                )
+            )
+            elapsed = time.perf_counter() - start
+
+        assert [result.ok for result in results] == [True] * 64
+        assert connector._pool._max_workers == 128
+        assert elapsed < 0.55
+        connector.close()
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+import pytest
+from ingest import BulkIngest, load_result, parse_payload
+from webtris_client import APIClient, APIResponseError
+from unittest.mock import Mock
+
+
+# builds a raw API response body for a site with the given number of rows
+def make_payload(site_name: str, rows: int) -> bytes:
+    return json.dumps(
+        {
+            "Rows": [
+                {
+                    "Site Name": site_name,
+                    "Report Date": "2024-01-01T00:00:00",
+                    "Time Period Ending": f"{(rows - 1 - i) // 4:02d}:{(rows - 1 - i) % 4 * 15 + 14:02d}:00",
+                    "Avg mph": str(50 + i),
+                    "Total Volume": "" if i == 0 else str(i),
+                }
+                for i in range(rows)
+            ]
+        }
+    ).encode("utf-8")
+
+
+# fixture for a small pool shared by the tests in this file
+@pytest.fixture(scope="module")
+def ingest():
+
+    with BulkIngest(workers=2) as bulk_ingest:
+        yield bulk_ingest
+
+
+# test cases for the process pool ingest (functions titles are self explanatory)
+class TestBulkIngest:
+    def test_parse_payload_shared_memory_round_trip(self):
+
+        columns = load_result(parse_payload(make_payload("Example Site", 96)))
+
+        assert len(columns) == 96
+        assert columns.site_name == "Example Site"
+        assert list(columns.times) == sorted(columns.times)
+
+    def test_parse_payload_without_shared_memory(self):
+
+        result = parse_payload(make_payload("Example Site", 4), use_shared_memory=False)
+
+        assert result[0] == "bytes"
+        assert len(load_result(result)) == 4
+
+    def test_parse_many_keeps_order(self, ingest):
+
+        payloads = [make_payload(f"Site {i}", 96) for i in range(6)]
+        results = ingest.parse_many(payloads)
+
+        assert [columns.site_name for columns in results] == [
+            f"Site {i}" for i in range(6)
+        ]
+        assert results[0].to_observations()[0].report_date == date(2024, 1, 1)
+
+    def test_parse_error_propagates(self, ingest):
+
+        with pytest.raises(APIResponseError):
+            ingest.parse_many([json.dumps({"Header": {}}).encode("utf-8")])
+
+    def test_ingest_sites(self, ingest):
+
+        connector = Mock()
+        connector.make_raw_request.side_effect = lambda url: make_payload(url, 8)
+        client = APIClient(connector=connector)
+
+        results = ingest.ingest_sites(client, [461, 462], "01012024")
+
+        assert set(results) == {461, 462}
+        assert "sites=462" in results[462].site_name
+        assert len(results[461]) == 8
+
+    def test_load_sites_computes_rollups_from_columns(self, ingest):
+
+        connector = Mock(spec=["make_raw_request"])
+        connector.make_raw_request.side_effect = lambda url: make_payload("Site", 8)
+        client = APIClient(connector=connector)
+
+        sites = ingest.load_sites(client, [461], "01012024")
+
+        assert sites[461].site_name == "Site"
+        assert len(sites[461]) == 8
+        assert sites[461].calculate_total_volume() == sum(range(1, 8))
+        assert sites[461].to_columns() is not None
+
+    def test_load_sites_uses_saved_rollups(self, ingest, tmp_path):
+
+        from archive import ArchiveConnector
+
+        client = APIClient(connector=ArchiveConnector(str(tmp_path)))
+        url = client.make_url(461, "01012024", "01012024")
+        client.connector.save(url, make_payload("Site", 8))
+        saved = client.connector.load_rollups(url)
+        client.connector.load_rollups = Mock(return_value=saved)
+
+        sites = ingest.load_sites(client, [461], "01012024")
+
+        client.connector.load_rollups.assert_called_once_with(url)
+        assert sites[461].rollups is saved
+
+    def test_no_leaked_shared_memory_warnings(self):
+
+        # run in a fresh interpreter so the resource tracker reports at exit
+        code = """
+from ingest import BulkIngest
+from test_ingest import make_payload
+if __name__ == "__main__":
+    with BulkIngest(workers=2) as ingest:
+        ingest.parse_many([make_payload("Example Site", 96) for _ in range(20)])
+"""
+        stderr = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+
+        assert "resource_tracker" not in stderr
+        assert "leaked" not in stderr
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from unittest.mock import Mock
+import pytest
+from main import date_range, main
+from webtris_client import APIClient
+
+
+# fixture for a client whose connector answers with two intervals per site-day
+@pytest.fixture
+def client(make_response):
+
+    connector = Mock()
+    connector.make_request.side_effect = make_response
+    return APIClient(connector=connector)
+
+
+# test cases for the command line tool (functions titles are self explanatory)
+class TestMain:
+    def test_date_range(self):
+
+        assert date_range("30122024", "02012025") == [
+            "30122024",
+            "31122024",
+            "01012025",
+            "02012025",
+        ]
+        with pytest.raises(ValueError, match="is before start date"):
+            date_range("02012025", "01012025")
+
+    def test_summary_jsonl(self, client, capsys):
+
+        exit_code = main(["461", "462", "--start", "01012024"], client=client)
+        output = capsys.readouterr()
+        rows = [json.loads(line) for line in output.out.splitlines()]
+
+        assert exit_code == 0
+        assert sorted(row["site_id"] for row in rows) == [461, 462]
+        assert rows[0]["total_volume"] == 200
+        assert rows[0]["peak_hour"] == 8
+        assert "Fetched 2/2 site-days, 2 rows" in output.err
+
+    def test_intervals_csv_to_file(self, client, tmp_path, capsys):
+
+        output_path = tmp_path / "out.csv"
+        sites_path = tmp_path / "sites.txt"
+        sites_path.write_text("461\n# comment\n\n462\n")
+
+        exit_code = main(
+            [
+                "--sites-file",
+                str(sites_path),
+                "--start",
+                "01012024",
+                "--end",
+                "02012024",
+                "--mode",
+                "intervals",
+                "--format",
+                "csv",
+                "--output",
+                str(output_path),
+                "--concurrency",
+                "3",
+            ],
+            client=client,
+        )
+        rows = list(csv.DictReader(io.StringIO(output_path.read_text())))
+
+        assert exit_code == 0
+        assert len(rows) == 8
+        assert rows[0]["time_period_ending"] in ("08:14:00", "08:29:00")
+        assert client.connector.make_request.call_count == 4
+
+    def test_errors_reported_per_site_day(self, client, capsys):
+
+        exit_code = main(["461", "999", "--start", "01012024"], client=client)
+        output = capsys.readouterr()
+
+        assert exit_code == 1
+        assert len(output.out.splitlines()) == 1
+        assert "Error for site 999 on 01012024" in output.err
+
+    def test_no_sites(self, client, capsys):
+
+        assert main(["--start", "01012024"], client=client) == 2
+        assert "No site IDs given" in capsys.readouterr().err
@@ -0,0 +1,253 @@
+import json
+import random
+from datetime import date, time
+from unittest.mock import Mock
+import pytest
+from archive import ArchiveConnector
+from columns import MISSING, ObservationColumns
+from site_store import SiteStore
+from webtris_client import APIClient, Observation
+
+pytest.importorskip("numpy")
+from query import (  # noqa: E402
+    ArchiveSource,
+    ColumnsSource,
+    Query,
+    SiteStoreSource,
+)
+
+
+# speed for a slot of the test days, dropping during the 8am hour
+def rush_hour_speed(slot: int) -> int:
+    return 30 if slot // 4 == 8 else 60
+
+
+# volume for a slot of the test days, the hour of the slot with a gap at midnight
+def hourly_volume(slot: int) -> int | None:
+    return None if slot == 0 else slot // 4
+
+
+# fixture for an in-memory source with two sites over three days
+@pytest.fixture
+def source(make_day):
+
+    return ColumnsSource(
+        {
+            site_id: [
+                ObservationColumns.from_observations(
+                    make_day(
+                        date(2024, 1, day),
+                        f"Site {site_id}",
+                        rush_hour_speed,
+                        hourly_volume,
+                    )
+                )
+                for day in (1, 2, 3)
+            ]
+            for site_id in (461, 462)
+        }
+    )
+
+
+# test cases for Query class (functions titles are self explanatory)
+class TestQuery:
+    def test_group_by_site(self, source):
+
+        rows = (
+            Query(source)
+            .group_by("site")
+            .aggregate("total_volume", "sum")
+            .aggregate("total_volume", "count")
+            .run()
+        )
+
+        assert rows == [
+            {"site_id": 461, "total_volume_sum": 3 * 1104, "total_volume_count": 285},
+            {"site_id": 462, "total_volume_sum": 3 * 1104, "total_volume_count": 285},
+        ]
+
+    def test_filters_and_group_by_day_and_hour(self, source):
+
+        query = (
+            Query(source)
+            .sites([462])
+            .dates(date(2024, 1, 2), date(2024, 1, 3))
+            .time_window(time(7), time(10))
+            .where("avg_speed", "<", 40)
+            .group_by("day", "hour")
+            .aggregate("avg_speed", "mean")
+            .aggregate("total_volume", "max")
+        )
+        rows = query.run()
+
+        assert rows == [
+            {
+                "report_date": date(2024, 1, 2),
+                "hour": 8,
+                "avg_speed_mean": 30,
+                "total_volume_max": 8,
+            },
+            {
+                "report_date": date(2024, 1, 3),
+                "hour": 8,
+                "avg_speed_mean": 30,
+                "total_volume_max": 8,
+            },
+        ]
+        assert query.blocks_read == 2
+
+    def test_time_window_wraps_midnight(self, source):
+
+        rows = (
+            Query(source)
+            .sites([461])
+            .dates(date(2024, 1, 1), date(2024, 1, 1))
+            .time_window(time(23), time(1))
+            .group_by("hour")
+            .aggregate("total_volume", "min")
+            .run()
+        )
+
+        assert rows == [
+            {"hour": 0, "total_volume_min": 0},
+            {"hour": 23, "total_volume_min": 23},
+        ]
+
+    def test_no_groups(self, source):
+
+        rows = Query(source).aggregate("avg_speed", "mean").run()
+
+        assert rows == [{"avg_speed_mean": (92 * 60 + 4 * 30) / 96}]
+
+    def test_matches_row_by_row_totals(self):
+
+        rng = random.Random(1)
+        observations = [
+            Observation(
+                "Example Site",
+                date(2024, 1, day),
+                time(hour=slot // 4, minute=slot % 4 * 15 + 14),
+                rng.choice([None, rng.randint(20, 70)]),
+                rng.choice([None, rng.randint(0, 300)]),
+            )
+            for day in (5, 1, 3)
+            for slot in range(96)
+        ]
+        columns = ObservationColumns.from_observations(observations)
+
+        rows = (
+            Query(ColumnsSource({461: [columns]}))
+            .time_window(time(22), time(6))
+            .where("avg_speed", ">=", 40)
+            .group_by("hour", "day")
+            .aggregate("total_volume", "sum")
+            .aggregate("total_volume", "count")
+            .aggregate("total_volume", "max")
+            .aggregate("total_volume", "min")
+            .run()
+        )
+
+        expected = {}
+        for observation in observations:
+            hour = observation.time_period_ending.hour
+            if not (hour >= 22 or hour < 6) or observation.avg_speed is None:
+                continue
+            if observation.avg_speed < 40:
+                continue
+            volumes = expected.setdefault((hour, observation.report_date), [])
+            if observation.total_volume is not None:
+                volumes.append(observation.total_volume)
+
+        assert rows == [
+            {
+                "hour": hour,
+                "report_date": report_date,
+                "total_volume_sum": sum(volumes),
+                "total_volume_count": len(volumes),
+                "total_volume_max": max(volumes, default=None),
+                "total_volume_min": min(volumes, default=None),
+            }
+            for (hour, report_date), volumes in sorted(expected.items())
+        ]
+        assert MISSING in columns.total_volumes
+
+    def test_invalid_input(self, source):
+
+        with pytest.raises(ValueError, match="Field must be one of"):
+            Query(source).where("speed", "<", 1)
+        with pytest.raises(ValueError, match="Operator must be one of"):
+            Query(source).where("avg_speed", "=~", 1)
+        with pytest.raises(ValueError, match="Group key must be one of"):
+            Query(source).group_by("month")
+        with pytest.raises(ValueError, match="Aggregate must be one of"):
+            Query(source).aggregate("avg_speed", "median")
+        with pytest.raises(ValueError, match="is before start date"):
+            Query(source).dates(date(2024, 1, 2), date(2024, 1, 1))
+
+
+# test cases for the storage sources (functions titles are self explanatory)
+class TestSources:
+    def test_site_store_source_only_loads_matching_days(self, tmp_path, make_day):
+
+        store = SiteStore(max_bytes=1, spill_path=str(tmp_path / "spill.bin"))
+        for day in (1, 2, 3):
+            store.put(
+                461,
+                date(2024, 1, day),
+                make_day(
+                    date(2024, 1, day), "Site 461", rush_hour_speed, hourly_volume
+                ),
+            )
+        store.put(
+            462,
+            date(2024, 1, 3),
+            make_day(date(2024, 1, 3), "Site 462", rush_hour_speed, hourly_volume),
+        )
+
+        store.get = Mock(wraps=store.get)
+        query = (
+            Query(SiteStoreSource(store))
+            .sites([461])
+            .dates(date(2024, 1, 1), date(2024, 1, 2))
+            .group_by("day")
+            .aggregate("total_volume", "sum")
+        )
+
+        assert [row["total_volume_sum"] for row in query.run()] == [1104, 1104]
+        assert query.blocks_read == 2
+        assert [call.args for call in store.get.call_args_list] == [
+            (461, date(2024, 1, 1)),
+            (461, date(2024, 1, 2)),
+        ]
+        store.close()
+
+    def test_archive_source_skips_other_files(self, tmp_path):
+
+        archive = ArchiveConnector(str(tmp_path))
+        client = APIClient(connector=Mock())
+        for site_id, day in [(461, "01012024"), (461, "02012024"), (462, "01012024")]:
+            rows = [
+                {
+                    "Site Name": f"Site {site_id}",
+                    "Report Date": f"2024-01-{day[:2]}T00:00:00",
+                    "Time Period Ending": "08:14:00",
+                    "Avg mph": "50",
+                    "Total Volume": str(site_id),
+                }
+            ]
+            archive.save(
+                client.make_url(site_id, day, day),
+                json.dumps({"Rows": rows}).encode("utf-8"),
+            )
+        (tmp_path / "notes.txt").write_text("not an archive file")
+
+        query = (
+            Query(ArchiveSource(str(tmp_path)))
+            .sites([461])
+            .dates(date(2024, 1, 2), date(2024, 1, 2))
+            .group_by("site")
+            .aggregate("total_volume", "sum")
+        )
+
+        assert query.run() == [{"site_id": 461, "total_volume_sum": 461}]
+        assert query.blocks_read == 1
@@ -0,0 +1,162 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from response_cache import ResponseCache
+from webtris_client import APIConnectionError, APIConnector
+
+# repetitive JSON body like the real API, so it compresses well
+BODY = json.dumps(
+    {
+        "Rows": [
+            {
+                "Site Name": "Example Site",
+                "Report Date": "2024-01-01T00:00:00",
+                "Time Period Ending": f"{slot // 4:02d}:{slot % 4 * 15 + 14:02d}:00",
+                "Avg mph": "60",
+                "Total Volume": "100",
+            }
+            for slot in range(96)
+        ]
+    }
+).encode("utf-8")
+ETAG = '"v1"'
+
+
+# local server that gzips the body and answers conditional requests with 304, or an HTML page for /maintenance
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.request_headers.append(dict(self.headers))
+        if self.path.startswith("/maintenance"):
+            body = b"<html><body>Down for maintenance</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = gzip.compress(BODY) if compressed else BODY
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# fixture for the URL of a running local server
+@pytest.fixture
+def server():
+
+    pytest.importorskip("requests")
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.request_headers = []
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+# test cases for compressed and conditional requests (functions titles are self explanatory)
+class TestTransport:
+    def test_compressed_transfer_recorded(self, server):
+
+        connector = APIConnector(timeout=5)
+        url = f"http://127.0.0.1:{server.server_port}/?sites=461"
+
+        assert connector.make_raw_request(url) == BODY
+        assert connector.stats.requests == 1
+        assert connector.stats.decoded_bytes == len(BODY)
+        assert connector.stats.wire_bytes == len(gzip.compress(BODY))
+        assert connector.stats.compression_ratio > 5
+
+    def test_unchanged_page_revalidated(self, server):
+
+        connector = APIConnector(timeout=5, cache=ResponseCache())
+        url = f"http://127.0.0.1:{server.server_port}/?sites=461"
+
+        first = connector.make_request(url)
+        second = connector.make_request(url)
+
+        assert first == second
+        assert server.request_headers[1]["If-None-Match"] == ETAG
+        assert connector.stats.not_modified == 1
+        assert connector.get_response(url).not_modified
+        assert connector.stats.decoded_bytes == len(BODY)
+
+    def test_disk_cache_survives_new_connector(self, server, tmp_path):
+
+        url = f"http://127.0.0.1:{server.server_port}/?sites=461"
+        APIConnector(timeout=5, cache=ResponseCache(str(tmp_path))).make_request(url)
+
+        connector = APIConnector(timeout=5, cache=ResponseCache(str(tmp_path)))
+        assert connector.make_raw_request(url) == BODY
+        assert connector.stats.not_modified == 1
+
+    def test_non_json_body_raises_connection_error(self, server):
+
+        connector = APIConnector(timeout=5)
+        url = f"http://127.0.0.1:{server.server_port}/maintenance?sites=461"
+
+        with pytest.raises(APIConnectionError, match="Network error"):
+            connector.make_request(url)
+        assert connector.make_raw_request(url).startswith(b"<html>")
+
+
+# test cases for ResponseCache class (functions titles are self explanatory)
+class TestResponseCache:
+    def test_memory_cache_evicts_oldest(self):
+
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", b"1", '"a"', None)
+        cache.put("b", b"2", '"b"', None)
+        cache.get("a")
+        cache.put("c", b"3", None, "Mon, 01 Jan 2024 00:00:00 GMT")
+
+        assert cache.get("b") is None
+        assert cache.get("a").body == b"1"
+        assert cache.get("c").last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    def test_disk_cache_round_trip(self, tmp_path):
+
+        cache = ResponseCache(str(tmp_path))
+        cache.put("url", BODY, ETAG, None)
+
+        cached = cache.get("url")
+        assert cached.body == BODY
+        assert cached.etag == ETAG
+        assert cache.get("other") is None
+
+    def test_corrupt_disk_entries_are_misses(self, tmp_path):
+
+        cache = ResponseCache(str(tmp_path))
+        cache.put("truncated", BODY, ETAG, None)
+        cache.put("garbage", BODY, ETAG, None)
+        cache.put("bad header", BODY, ETAG, None)
+
+        with open(cache._file_path("truncated"), "r+b") as file:
+            file.truncate(20)
+        with open(cache._file_path("garbage"), "wb") as file:
+            file.write(b"not gzip data")
+        with gzip.open(cache._file_path("bad header"), "wb") as file:
+            file.write(b"{not json\n" + BODY)
+
+        assert cache.get("truncated") is None
+        assert cache.get("garbage") is None
+        assert cache.get("bad header") is None
@@ -0,0 +1,147 @@
+from datetime import date, time
+import pytest
+from columns import ObservationColumns
+from rollups import SiteRollups
+from webtris_client import Observation, SingleSite
+
+
+# fixture for observations over two days with missing data
+@pytest.fixture
+def two_day_observations():
+
+    return [
+        Observation("Example Site", date(2024, 1, 1), time(8, 14), 50, 100),
+        Observation("Example Site", date(2024, 1, 1), time(8, 29), None, 200),
+        Observation("Example Site", date(2024, 1, 1), time(17, 14), 40, 150),
+        Observation("Example Site", date(2024, 1, 2), time(8, 14), 60, None),
+        Observation("Example Site", date(2024, 1, 2), time(17, 14), 30, 500),
+    ]
+
+
+# test cases for SiteRollups class (functions titles are self explanatory)
+class TestSiteRollups:
+    def test_daily_rollups(self, two_day_observations):
+
+        rollups = SiteRollups.from_observations(two_day_observations)
+
+        assert rollups.avg_speed(date(2024, 1, 1)) == 45
+        assert rollups.total_volume(date(2024, 1, 1)) == 450
+        assert rollups.total_volume(date(2024, 1, 2)) == 500
+        assert rollups.avg_speed(date(2024, 1, 3)) is None
+        assert rollups.total_volume(date(2024, 1, 3)) == 0
+
+    def test_overall_rollups(self, two_day_observations):
+
+        rollups = SiteRollups.from_observations(two_day_observations)
+
+        assert rollups.avg_speed() == (50 + 40 + 60 + 30) / 4
+        assert rollups.total_volume() == 950
+
+    def test_hourly_rollups(self, two_day_observations):
+
+        rollups = SiteRollups.from_observations(two_day_observations)
+
+        assert rollups.avg_speed_for_hour(8) == (50 + 60) / 2
+        assert rollups.avg_speed_for_hour(8, date(2024, 1, 2)) == 60
+        assert rollups.total_volume_for_hour(8, date(2024, 1, 1)) == 300
+        assert rollups.total_volume_for_hour(3) == 0
+        with pytest.raises(ValueError, match="Hour must be between 0 and 23, got 24"):
+            rollups.total_volume_for_hour(24)
+
+    def test_peak_hour(self, two_day_observations):
+
+        rollups = SiteRollups.from_observations(two_day_observations)
+
+        assert rollups.peak_hour() == 17
+        assert rollups.peak_hour(date(2024, 1, 1)) == 8
+        assert SiteRollups().peak_hour() is None
+
+    def test_add_columns_matches_observations(self, two_day_observations):
+
+        from_columns = SiteRollups()
+        from_columns.add_columns(
+            ObservationColumns.from_observations(two_day_observations)
+        )
+        expected = SiteRollups.from_observations(two_day_observations)
+
+        assert from_columns.avg_speed() == expected.avg_speed()
+        assert from_columns.total_volume_for_hour(17) == 650
+        assert from_columns.peak_hour(date(2024, 1, 2)) == 17
+
+    def test_save_and_load(self, two_day_observations, tmp_path):
+
+        rollups = SiteRollups.from_observations(two_day_observations)
+        rollups.save(str(tmp_path / "rollups.json"))
+        loaded = SiteRollups.load(str(tmp_path / "rollups.json"))
+
+        assert loaded.avg_speed() == rollups.avg_speed()
+        assert loaded.total_volume_for_hour(8) == rollups.total_volume_for_hour(8)
+        assert loaded.peak_hour(date(2024, 1, 1)) == 8
+        assert not loaded.is_new(two_day_observations[2])
+        assert loaded.is_new(
+            Observation("Example Site", date(2024, 1, 1), time(8, 44), 50, 100)
+        )
+
+
+# test cases for keeping SingleSite rollups up to date
+class TestSingleSiteRollups:
+    def test_append_only_adds_new_intervals(self, two_day_observations):
+
+        site = SingleSite(site_id=461, site_name="Example Site")
+        site.observations = two_day_observations[:3]
+
+        added = site.append_observations(
+            two_day_observations[1:]  # overlaps with the stored intervals
+        )
+
+        assert added == 2
+        assert len(site) == 5
+        assert site.calculate_total_volume() == 950
+        assert site.find_peak_hour() == 17
+
+    def test_append_fills_gaps(self):
+
+        def observation(minute):
+            return Observation(
+                "Example Site", date(2024, 1, 1), time(0, minute), 60, 10
+            )
+
+        site = SingleSite(site_id=461, site_name="Example Site")
+        site.observations = [observation(14), observation(44)]
+
+        added = site.append_observations(
+            [observation(14), observation(29), observation(44)]
+        )
+
+        assert added == 1
+        assert len(site) == 3
+        assert site.calculate_total_volume() == 30
+        assert [o.time_period_ending.minute for o in site.observations] == [14, 29, 44]
+
+    def test_update_data(self, two_day_observations):
+
+        from unittest.mock import Mock
+
+        client = Mock()
+        client.get_daily_data.return_value = two_day_observations
+        site = SingleSite(site_id=461, site_name="")
+
+        assert site.update_data(client, "01012024") == 5
+        assert site.update_data(client, "01012024") == 0
+        assert site.site_name == "Example Site"
+        assert site.calculate_avg_speed_for_hour(hour=17) == 35
+
+    def test_observations_cannot_change_in_place(self, two_day_observations):
+
+        site = SingleSite(site_id=461, site_name="Example Site")
+        site.observations = two_day_observations
+        site.to_columns()
+
+        with pytest.raises(AttributeError):
+            site.observations.append(two_day_observations[0])
+        with pytest.raises(AttributeError):
+            site.observations.clear()
+
+        site.observations = two_day_observations[:3]
+        assert site.calculate_total_volume() == 450
+        assert len(site.to_columns()) == 3
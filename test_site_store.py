@@ -0,0 +1,213 @@
+import os
+from datetime import date, time
+from unittest.mock import Mock
+import pytest
+from site_store import SiteStore
+from webtris_client import SingleSite
+
+
+# fixture for a store small enough that only one day fits in memory
+@pytest.fixture
+def small_store(tmp_path):
+
+    store = SiteStore(max_bytes=1, spill_path=str(tmp_path / "spill.bin"))
+    yield store
+    store.close()
+
+
+# test cases for SiteStore class (functions titles are self explanatory)
+class TestSiteStore:
+    def test_put_and_get(self, small_store, make_day):
+
+        day = make_day(date(2024, 1, 1))
+        small_store.put(461, date(2024, 1, 1), day)
+
+        assert small_store.get(461, date(2024, 1, 1)) is day
+        assert (461, date(2024, 1, 1)) in small_store
+        assert len(small_store) == 1
+
+    def test_least_recently_used_day_is_spilled(self, small_store, make_day):
+
+        small_store.put(461, date(2024, 1, 1), make_day(date(2024, 1, 1)))
+        small_store.put(461, date(2024, 1, 2), make_day(date(2024, 1, 2)))
+
+        assert not small_store.is_resident(461, date(2024, 1, 1))
+        assert small_store.is_resident(461, date(2024, 1, 2))
+        assert len(small_store) == 2
+
+    def test_spilled_day_reloads_unchanged(self, small_store, make_day):
+
+        day = make_day(date(2024, 1, 1), speed=55, volume=120)
+        day[3].avg_speed = None  # missing data should survive the round trip
+        small_store.put(461, date(2024, 1, 1), day)
+        small_store.put(461, date(2024, 1, 2), make_day(date(2024, 1, 2)))
+
+        reloaded = small_store.get(461, date(2024, 1, 1))
+
+        assert small_store.is_resident(461, date(2024, 1, 1))
+        assert not small_store.is_resident(461, date(2024, 1, 2))
+        assert [repr(observation) for observation in reloaded] == [
+            repr(observation) for observation in day
+        ]
+
+    def test_off_grid_day_reloads_unchanged(self, small_store, make_day):
+
+        day = make_day(date(2024, 1, 1))
+        day[5].time_period_ending = time(hour=1, minute=20)  # not on the 15 minute grid
+        day[6].avg_speed = day[6].total_volume = None
+        small_store.put(461, date(2024, 1, 1), day)
+        small_store.put(461, date(2024, 1, 2), make_day(date(2024, 1, 2)))
+
+        reloaded = small_store.get(461, date(2024, 1, 1))
+
+        assert [repr(observation) for observation in reloaded] == [
+            repr(observation) for observation in day
+        ]
+
+    def test_memory_stays_within_budget(self, tmp_path, make_day):
+
+        one_day = SiteStore(spill_path=str(tmp_path / "probe.bin"))
+        one_day.put(461, date(2024, 1, 1), make_day(date(2024, 1, 1)))
+        budget = one_day.memory_bytes * 3
+        one_day.close()
+
+        store = SiteStore(max_bytes=budget, spill_path=str(tmp_path / "spill.bin"))
+        for day in range(1, 11):
+            store.put(461, date(2024, 1, day), make_day(date(2024, 1, day)))
+
+        assert store.memory_bytes <= budget
+        assert len(store) == 10
+        store.close()
+
+    def test_discard(self, small_store, make_day):
+
+        small_store.put(461, date(2024, 1, 1), make_day(date(2024, 1, 1)))
+        small_store.put(461, date(2024, 1, 2), make_day(date(2024, 1, 2)))
+        small_store.discard(461, date(2024, 1, 1))
+
+        assert (461, date(2024, 1, 1)) not in small_store
+        with pytest.raises(KeyError):
+            small_store.get(461, date(2024, 1, 1))
+
+    def test_invalid_budget(self):
+
+        with pytest.raises(ValueError, match="Memory budget must be positive, got 0"):
+            SiteStore(max_bytes=0)
+
+    def test_reloading_days_does_not_grow_spill_file(self, small_store, make_day):
+
+        for day in range(1, 11):
+            small_store.put(461, date(2024, 1, day), make_day(date(2024, 1, day)))
+        for day in range(1, 11):
+            small_store.get(461, date(2024, 1, day))
+        size = os.path.getsize(small_store.spill_path)
+
+        for _ in range(5):
+            for day in range(1, 11):
+                small_store.get(461, date(2024, 1, day))
+
+        assert os.path.getsize(small_store.spill_path) == size
+        assert len(small_store) == 10
+        assert len(small_store.keys()) == 10
+
+    def test_spill_file_compacted(self, small_store, monkeypatch, make_day):
+
+        monkeypatch.setattr("site_store.COMPACT_MIN_DEAD_BYTES", 1)
+        for speed in (50, 60, 70):
+            for day in range(1, 11):
+                small_store.put(
+                    461, date(2024, 1, day), make_day(date(2024, 1, day), speed=speed)
+                )
+
+        assert small_store.get(461, date(2024, 1, 3))[0].avg_speed == 70
+        assert len(small_store) == 10
+        live, dead = small_store.spill_bytes
+        assert dead < live
+
+        small_store.close()
+        assert os.path.getsize(small_store.spill_path) == live + dead
+
+    def test_temporary_spill_file_removed_on_close(self):
+
+        store = SiteStore()
+        store.close()
+
+        with pytest.raises(FileNotFoundError):
+            open(store.spill_path)
+
+
+# test cases for SingleSite backed by a SiteStore
+class TestSingleSiteWithStore:
+    def test_methods_reload_spilled_days(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        site.observations = make_day(date(2024, 1, 1), speed=50, volume=10)
+        other = SingleSite(site_id=462, site_name="Other Site", store=small_store)
+        other.observations = make_day(date(2024, 1, 1))
+
+        assert not small_store.is_resident(461, date(2024, 1, 1))
+        assert site.calculate_avg_speed() == 50
+        assert site.calculate_total_volume() == 960
+        assert site.calculate_total_volume_for_hour(hour=3) == 40
+
+        small_store.get = Mock(wraps=small_store.get)
+        assert len(site) == 96
+        small_store.get.assert_not_called()
+
+    def test_multiple_days_split_in_store(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        site.observations = make_day(date(2024, 1, 1)) + make_day(date(2024, 1, 2))
+
+        assert len(small_store) == 2
+        assert len(site) == 192
+        assert [observation.report_date for observation in site][95:97] == [
+            date(2024, 1, 1),
+            date(2024, 1, 2),
+        ]
+
+    def test_replacing_observations_discards_old_days(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        site.observations = make_day(date(2024, 1, 1))
+        site.observations = make_day(date(2024, 1, 2))
+
+        assert (461, date(2024, 1, 1)) not in small_store
+        assert len(site) == 96
+
+    def test_append_observations_updates_stored_day(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        day = make_day(date(2024, 1, 1))
+        site.observations = day[:48]
+        site.append_observations(day + make_day(date(2024, 1, 2)))
+
+        assert len(small_store.get(461, date(2024, 1, 1))) == 96
+        assert len(site) == 192
+        assert site.calculate_total_volume() == 19200
+
+    def test_append_observations_fills_gaps_in_stored_day(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        day = make_day(date(2024, 1, 1))
+        site.observations = day[::2]
+
+        assert site.append_observations(day) == 48
+        assert small_store.get(461, date(2024, 1, 1)) == day
+        assert len(site) == 96
+
+    def test_columns_not_kept_in_memory_with_store(self, small_store, make_day):
+
+        site = SingleSite(site_id=461, site_name="Example Site", store=small_store)
+        site.observations = make_day(date(2024, 1, 1)) + make_day(date(2024, 1, 2))
+        columns = site.to_columns()
+
+        assert len(columns) == 192
+        assert site._columns is None
+        assert site.to_columns() is not columns
+
+        site.load_columns(columns)
+
+        assert site._columns is None
+        assert not small_store.is_resident(461, date(2024, 1, 1))
+        assert list(site.to_columns().avg_speeds) == list(columns.avg_speeds)
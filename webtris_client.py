@@ -1,6 +1,26 @@
+import json
+import threading
 from datetime import date, datetime, time
-from typing import Iterator, List, Dict, Any
-import requests
+from typing import Iterator, List, Dict, Any, Sequence, Tuple, TYPE_CHECKING
+from rollups import SiteRollups
+
+# requests is only imported when a request is made, so offline analysis starts faster
+if TYPE_CHECKING:
+    import requests
+    from columns import ObservationColumns
+    from response_cache import ResponseCache
+    from site_store import SiteStore
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports requests the first time webtris_client.requests is accessed.
+    """
+    if name == "requests":
+        import requests
+
+        return requests
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Observation:
@@ -73,18 +93,147 @@ class APIResponseError(Exception):
     pass
 
 
+class TransferStats:
+    """
+    Counts requests made by an APIConnector, the bytes received over the wire and after decompression, and how many were answered from the cache
+    """
+
+    # required attributes
+    requests: int
+    not_modified: int
+    wire_bytes: int
+    decoded_bytes: int
+
+    def __init__(self) -> None:
+        """
+        Creates TransferStats with every count set to zero
+        """
+        self.requests = 0
+        self.not_modified = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, wire_bytes: int, decoded_bytes: int, not_modified: bool) -> None:
+        """
+        Records one completed request
+        """
+        with self._lock:
+            self.requests += 1
+            self.not_modified += not_modified
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+
+    @property
+    def compression_ratio(self) -> float | None:
+        """
+        Returns decoded bytes per wire byte, returns None if nothing has been received
+        """
+        if not self.wire_bytes:
+            return None
+        return self.decoded_bytes / self.wire_bytes
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the stats including all counts
+        """
+        return f"TransferStats(requests={self.requests}, not_modified={self.not_modified}, wire_bytes={self.wire_bytes}, decoded_bytes={self.decoded_bytes})"
+
+
+class APIResponse:
+    """
+    The body of a successful API response, and whether it came from the cache because the page was unchanged
+    """
+
+    # required attributes
+    content: bytes
+    not_modified: bool
+
+    def __init__(self, content: bytes, not_modified: bool = False) -> None:
+        """
+        Creates an APIResponse with the response body and whether it was answered from the cache
+        """
+        self.content = content
+        self.not_modified = not_modified
+
+    def json(self) -> Any:
+        """
+        Returns the body decoded as JSON
+        """
+        return json.loads(self.content)
+
+
 class APIConnector:
     """
     Handles making API requests and API errors
     """
 
+    # encodings the API may compress responses with
+    ACCEPT_ENCODING = "gzip, deflate"
+
+    # seconds to wait for the API before giving up, None waits forever
+    timeout: float | None
+    cache: "ResponseCache | None"
+    stats: TransferStats
+    pool_size: int | None
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        cache: "ResponseCache | None" = None,
+        pool_size: int | None = None,
+    ) -> None:
+        """
+        Initialises the APIConnector with an optional request timeout in seconds, an optional ResponseCache used to revalidate pages with conditional requests, and an optional pool size to reuse up to that many connections across threads.
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = TransferStats()
+        self.pool_size = pool_size
+        self._session: "requests.Session | None" = None
+        self._session_lock = threading.Lock()
+
     def make_request(self, url: str) -> Dict[str, Any]:
         """
         Makes a get request to the API and returns the JSON response as a dictionary
         """
+        response = self.get_response(url)
+        try:
+            return response.json()  # return the json as a dictionary
+        # the body was not JSON, for example an HTML error page
+        except ValueError as e:
+            raise APIConnectionError(f"Network error: {e}")
+
+    def make_raw_request(self, url: str) -> bytes:
+        """
+        Makes a get request to the API and returns the undecoded response body
+        """
+        return self.get_response(url).content
+
+    def get_response(self, url: str) -> APIResponse:
+        """
+        Makes a get request to the API and returns the response body, raising an error for failed requests or error status codes
+        """
+        import requests
+
+        # ask for compressed responses, and only for the body if it changed since it was cached
+        headers = {"Accept-Encoding": self.ACCEPT_ENCODING}
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
         try:
-            # attempt to make the API request
-            response = requests.get(url)
+            # attempt to make the API request, on a pooled connection if there is a pool
+            get = requests.get if self.pool_size is None else self._get_session().get
+            response = get(url, timeout=self.timeout, headers=headers)
+
+            # unchanged since it was cached, answer with the cached body
+            if response.status_code == 304 and cached is not None:
+                self.stats.record(_wire_bytes(response, 0), 0, not_modified=True)
+                return APIResponse(cached.body, not_modified=True)
 
             # check for errors from site call
             if response.status_code == 404:
@@ -96,7 +245,17 @@ class APIConnector:
                     f"API returned status code {response.status_code}"
                 )
 
-            return response.json()  # return the json as a dictionary if no errors
+            body = response.content
+            self.stats.record(
+                _wire_bytes(response, len(body)), len(body), not_modified=False
+            )
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if self.cache is not None and (etag or last_modified):
+                self.cache.put(url, body, etag, last_modified)
+
+            return APIResponse(body)  # return the body if no errors
 
         # errors if the request fails
         except requests.exceptions.Timeout:
@@ -108,6 +267,45 @@ class APIConnector:
         except requests.exceptions.RequestException as e:
             raise APIConnectionError(f"Network error: {e}")
 
+    def close(self) -> None:
+        """
+        Closes the pooled connections, if any were opened
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _get_session(self) -> "requests.Session":
+        """
+        Returns the session shared by every thread using this connector, creating it with a connection pool of pool_size on first use
+        """
+        import requests
+
+        with self._session_lock:
+            if self._session is None:
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                )
+                self._session = requests.Session()
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+            return self._session
+
+
+def _wire_bytes(response: "requests.Response", decoded_bytes: int) -> int:
+    """
+    Returns the number of body bytes received over the wire before decompression, falling back to Content-Length or the decoded size
+    """
+    try:
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        pass
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, TypeError, ValueError):
+        return decoded_bytes
+
 
 class APIClient:
     """
@@ -124,6 +322,15 @@ class APIClient:
         """
         self.connector = connector
 
+    @classmethod
+    def offline(cls, archive_path: str) -> "APIClient":
+        """
+        Creates an APIClient that is served entirely from a local archive, without importing requests or using the network.
+        """
+        from archive import ArchiveConnector
+
+        return cls(connector=ArchiveConnector(archive_path))
+
     def get_daily_data(self, site_id: int, date: str) -> List[Observation]:
         """
         Validates the date, gets daily traffic data for the given site, and returns a sorted list of Observation objects.
@@ -224,87 +431,175 @@ class SingleSite:
     # required attributes
     site_id: int
     site_name: str
-    observations: List[Observation]
+    store: "SiteStore | None"
+    rollups: SiteRollups
 
-    def __init__(self, site_id: int, site_name: str) -> None:
+    def __init__(
+        self, site_id: int, site_name: str, store: "SiteStore | None" = None
+    ) -> None:
         """
-        Creates a SingleSite with a site ID, site name, and an empty observations list.
+        Creates a SingleSite with a site ID, site name, and an empty observations list, optionally kept in a SiteStore instead of in memory.
         """
         self.site_id = site_id
         self.site_name = site_name
+        self.store = store
+        self._dates: List[date] = []
+
+        # held while observations or rollups change, and while they are read, so threads can share a site
+        self._lock = threading.RLock()
         self.observations = []
 
+    @property
+    def observations(self) -> Tuple[Observation, ...]:
+        """
+        Returns the observations for this site as a tuple, reloading any days the store has spilled to disk, assign to it or use append_observations to change them.
+        """
+        if self.store is None:
+            return self._observations
+
+        with self._lock:
+            observations = []
+            for report_date in self._dates:
+                observations.extend(self.store.get(self.site_id, report_date))
+            return tuple(observations)
+
+    @observations.setter
+    def observations(self, observations: Sequence[Observation]) -> None:
+        """
+        Replaces the observations for this site and rebuilds its rollups, splitting them into days when a store is used.
+        """
+        self._replace(observations, SiteRollups.from_observations(observations))
+
+    def _replace(
+        self, observations: Sequence[Observation], rollups: SiteRollups
+    ) -> None:
+        """
+        Replaces the observations and rollups together, splitting the observations into days when a store is used.
+        """
+        # kept as a tuple so they cannot change without the rollups and columns being rebuilt
+        observations = tuple(observations)
+
+        with self._lock:
+            self.rollups = rollups
+            self._columns = None
+
+            if self.store is None:
+                self._observations = observations
+                return
+
+            # drop the days this site previously held
+            for report_date in self._dates:
+                self.store.discard(self.site_id, report_date)
+
+            days: Dict[date, List[Observation]] = {}
+            for observation in observations:
+                days.setdefault(observation.report_date, []).append(observation)
+
+            self._dates = list(days)
+            for report_date, day_observations in days.items():
+                self.store.put(self.site_id, report_date, day_observations)
+
+    def load_columns(
+        self, columns: "ObservationColumns", rollups: SiteRollups | None = None
+    ) -> None:
+        """
+        Replaces the observations for this site with ObservationColumns, using rollups computed at ingest or loaded from disk if given instead of rebuilding them.
+        """
+        if rollups is None:
+            rollups = SiteRollups.from_columns(columns)
+
+        with self._lock:
+            self._replace(columns.to_observations(), rollups)
+            # a store bounds memory by spilling days, so it must not be paired with a full copy
+            if self.store is None:
+                self._columns = columns
+            if len(columns):
+                self.site_name = columns.site_name
+
     def get_data(self, client: APIClient, date: str) -> None:
         """
         Uses an APIClient to get and store Observations for this site on the given date.
         """
-        self.observations = client.get_daily_data(self.site_id, date)
+        observations = client.get_daily_data(self.site_id, date)
 
-        # update site name from observations if it exists
-        if self.observations:
-            self.site_name = self.observations[0].site_name
+        with self._lock:
+            self.observations = observations
 
-    def calculate_avg_speed(self) -> float | None:
+            # update site name from observations if it exists
+            if observations:
+                self.site_name = observations[0].site_name
+
+    def update_data(self, client: APIClient, date: str) -> int:
         """
-        Calculates the average speed for all observations with valid speed data, returns None if no valid data exists.
+        Uses an APIClient to get Observations for the given date and adds only the intervals this site does not have yet, returns how many were added.
         """
-        valid_speeds = [
-            observation.avg_speed
-            for observation in self.observations
-            if observation.avg_speed is not None
-        ]
+        return self.append_observations(client.get_daily_data(self.site_id, date))
 
-        if not valid_speeds:
-            return None
+    def append_observations(self, observations: List[Observation]) -> int:
+        """
+        Adds observations for 15 minute slots this site does not have yet, including late ones that fill gaps, keeping each day in time order and updating the rollups in place, returns how many were added.
+        """
+        observations = sorted(observations)
 
-        return sum(valid_speeds) / len(valid_speeds)
+        with self._lock:
+            new_observations = []
+            for observation in observations:
+                if self.rollups.is_new(observation):
+                    self.rollups.add(observation)
+                    new_observations.append(observation)
+
+            if not new_observations:
+                return 0
+            self._columns = None
+
+            if self.store is None:
+                self._observations = tuple(
+                    sorted(self._observations + tuple(new_observations))
+                )
+            else:
+                days: Dict[date, List[Observation]] = {}
+                for observation in new_observations:
+                    days.setdefault(observation.report_date, []).append(observation)
+                for report_date, day_observations in days.items():
+                    if report_date in self._dates:
+                        day_observations = sorted(
+                            self.store.get(self.site_id, report_date) + day_observations
+                        )
+                    else:
+                        self._dates.append(report_date)
+                    self.store.put(self.site_id, report_date, day_observations)
+
+            if not self.site_name:
+                self.site_name = new_observations[0].site_name
+            return len(new_observations)
+
+    def calculate_avg_speed(self) -> float | None:
+        """
+        Calculates the average speed for all observations with valid speed data, returns None if no valid data exists.
+        """
+        with self._lock:
+            return self.rollups.avg_speed()
 
     def calculate_total_volume(self) -> int:
         """
         Calculates the total vehicle volume for all observations with valid volume data.
         """
-        total = sum(
-            observation.total_volume
-            for observation in self.observations
-            if observation.total_volume is not None
-        )
-
-        return total
+        with self._lock:
+            return self.rollups.total_volume()
 
     def calculate_avg_speed_for_hour(self, hour: int) -> float | None:
         """
         Calculates the average speed for a specific hour, returns None if no valid data exists for that hour, raises a ValueError for invalid hour input.
         """
-        # catch invalid hour
-        if not (0 <= hour <= 23):
-            raise ValueError(f"Hour must be between 0 and 23, got {hour}")
-
-        hourly_records = [
-            observation.avg_speed
-            for observation in self.all_observations_for_hour(hour)
-            if observation.avg_speed is not None
-        ]
-
-        if not hourly_records:
-            return None
-
-        return sum(hourly_records) / len(hourly_records)
+        with self._lock:
+            return self.rollups.avg_speed_for_hour(hour)
 
     def calculate_total_volume_for_hour(self, hour: int) -> int:
         """
         Calculates the total vehicle volume for a specific hour of the day, raises a ValueError for invalid hour input.
         """
-        # catch invalid hour input
-        if not (0 <= hour <= 23):
-            raise ValueError(f"Hour must be between 0 and 23, got {hour}")
-
-        hourly_records = [
-            observation.total_volume
-            for observation in self.all_observations_for_hour(hour)
-            if observation.total_volume is not None
-        ]
-
-        return sum(hourly_records)
+        with self._lock:
+            return self.rollups.total_volume_for_hour(hour)
 
     def all_observations_for_hour(self, hour: int) -> List[Observation]:
         """
@@ -314,41 +609,66 @@ class SingleSite:
         if not (0 <= hour <= 23):
             raise ValueError(f"Hour must be between 0 and 23, got {hour}")
 
-        return [
-            observation
-            for observation in self.observations
-            if observation.time_period_ending.hour == hour
-        ]
+        with self._lock:
+            return [
+                observation
+                for observation in self.observations
+                if observation.time_period_ending.hour == hour
+            ]
 
     def find_peak_hour(self) -> int | None:
         """
         Returns the hour with the highest total vehicle volume, returns None if there are no observations or all volume data is missing.
         """
-        # check for observations
-        if not self.observations:
-            return None
+        with self._lock:
+            return self.rollups.peak_hour()
 
-        # calculate volume for each hour
-        hourly_volumes = {}
-        for hour in range(24):
-            volume = self.calculate_total_volume_for_hour(hour)
-            if volume > 0:  # Only include hours with actual traffic
-                hourly_volumes[hour] = volume
+    def to_columns(self) -> "ObservationColumns":
+        """
+        Returns this site's observations as ObservationColumns, built once and reused until the observations change, or rebuilt on every call when a store is used.
+        """
+        from columns import ObservationColumns
 
-        # find hour with max volume
-        peak_hour = (
-            max(hourly_volumes, key=hourly_volumes.get) if hourly_volumes else None
-        )
-        return peak_hour
+        with self._lock:
+            if self.store is not None:
+                return ObservationColumns.from_observations(self.observations)
+            if self._columns is None:
+                self._columns = ObservationColumns.from_observations(self.observations)
+            return self._columns
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Exports this site's observations as a dict of NumPy arrays, requires numpy.
+        """
+        from export import to_numpy
+
+        return to_numpy(self.to_columns())
+
+    def to_pandas(self) -> Any:
+        """
+        Exports this site's observations as a pandas DataFrame, requires pandas.
+        """
+        from export import to_pandas
+
+        return to_pandas(self.to_columns(), site_id=self.site_id)
+
+    def to_arrow(self) -> Any:
+        """
+        Exports this site's observations as a pyarrow Table, requires pyarrow.
+        """
+        from export import to_arrow
+
+        return to_arrow(self.to_columns(), site_id=self.site_id)
 
     def __iter__(self) -> Iterator[Observation]:
         """
-        Allows iteration over all observations.
+        Allows iteration over all observations, as they were when iteration started.
         """
         return iter(self.observations)
 
     def __len__(self) -> int:
         """
-        Returns the total number of observations stored in this site.
+        Returns the total number of observations stored in this site, counted by the rollups so spilled days are not reloaded.
         """
-        return len(self.observations)
+        with self._lock:
+            return self.rollups.rows()